@@ -1,8 +1,12 @@
 import os
+import hmac
 import uuid
 import logging
-from datetime import datetime
-from flask import Flask, request, jsonify
+import threading
+from functools import wraps
+import redis
+from datetime import date, datetime, timedelta
+from flask import Flask, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_limiter import Limiter
@@ -12,7 +16,29 @@ from config import config
 from models import db, Order, InvitationLog, Package, AdminAccount
 from utils.validators import validate_order_data
 from utils.tripay_client import get_tripay_client
-from utils.email_service import send_payment_confirmation, send_admin_notification
+from utils.order_status import (
+    NOT_FOUND_MARKER, build_status_payload, get_cached_order_status,
+    cache_order_status, cache_missing_order_status, status_etag, compute_poll_after,
+    get_order_statuses
+)
+from utils.order_events import subscribe_order_status, stream_order_status
+from utils.webhook_events import record_webhook_event
+from utils.webhook_filter import WebhookFilter
+from utils.order_expiry import schedule_order_expiry
+from utils.order_archive import find_order
+from utils.db_routing import read_replica, reading_from_replica, get_replica_lag
+from utils.db_pool import build_engine_options, get_pool_stats
+from utils.order_listing import (
+    build_order_filters, list_order_rows, dump_order_listing, count_orders, estimate_order_count
+)
+from utils.order_rollups import STATS_GROUPS, record_order_created, get_order_stats
+from utils.order_export import EXPORT_FORMATS, iter_export_rows, iter_csv, iter_ndjson, iter_gzip
+from utils.package_catalog import get_package_catalog, get_package
+from utils.payment_channels import get_active_payment_channels, is_supported_payment_method
+from utils.idempotency import (
+    MAX_IDEMPOTENCY_KEY_LENGTH, fingerprint_payload, claim_idempotency_key,
+    store_idempotent_response, release_idempotency_key
+)
 
 # Configure logging
 logging.basicConfig(
@@ -30,12 +56,13 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     
     # Initialize extensions
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
     db.init_app(app)
     migrate = Migrate(app, db)
     
     CORS(app, 
          origins=app.config['ALLOWED_ORIGINS'],
-         allow_headers=['Content-Type', 'Authorization', 'Accept'],
+         allow_headers=['Content-Type', 'Authorization', 'Accept', 'Idempotency-Key'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
          supports_credentials=True)
     
@@ -43,6 +70,40 @@ def create_app(config_name=None):
     limiter = Limiter(key_func=get_remote_address)
     limiter.init_app(app)
     
+    # Pre-parse filter for Tripay callbacks
+    webhook_filter = WebhookFilter(
+        app.config['TRIPAY_PRIVATE_KEY'],
+        allowed_ips=app.config.get('ALLOWED_WEBHOOK_IPS', []),
+        trusted_proxies=app.config.get('TRUSTED_PROXY_IPS', []),
+        max_body_bytes=app.config.get('WEBHOOK_MAX_BODY_BYTES', 16384)
+    )
+    
+    def require_webhook_signature(view):
+        """Reject junk callback traffic before JSON parsing or logging"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            rejection = webhook_filter.check(request)
+            if rejection:
+                return jsonify({'error': rejection[0]}), rejection[1]
+            return view(*args, **kwargs)
+        return wrapper
+    
+    def require_admin_token(view):
+        """Only serve requests carrying 'Authorization: Bearer <ADMIN_API_TOKEN>'"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            expected = app.config.get('ADMIN_API_TOKEN')
+            if not expected:
+                return jsonify({'error': 'Admin API disabled'}), 403
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), expected.encode()):
+                return jsonify({'error': 'Unauthorized'}), 401
+            return view(*args, **kwargs)
+        return wrapper
+    
+    # Each open status stream holds a worker thread; keep some free for regular requests
+    order_stream_slots = threading.BoundedSemaphore(app.config.get('ORDER_EVENTS_MAX_STREAMS', 16))
+    
     # Initialize Celery (optional)
     celery = None
     if app.config.get('ENABLE_CELERY', False):
@@ -67,22 +128,64 @@ def create_app(config_name=None):
     def healthz():
         """Alternative health check endpoint"""
         return health_check()
+    
+    @app.route('/api/admin/metrics', methods=['GET'])
+    @limiter.limit("60 per minute")
+    @require_admin_token
+    def admin_get_metrics():
+        """Operational metrics kept off the public health check; replica lag costs a query per call"""
+        return jsonify({
+            'timestamp': datetime.utcnow().isoformat(),
+            'webhook_filter': dict(webhook_filter.counters),  # This worker only
+            'database_replica': get_replica_lag(db),
+            'database_pool': get_pool_stats(db)  # This worker only
+        })
 
     
     @app.route('/api/orders', methods=['POST'])
     @limiter.limit("10 per minute")
     def create_order():
         """Create new order and initiate payment"""
+        idempotency_key = request.headers.get('Idempotency-Key')
+        fingerprint = None
+        
+        def respond(body, status_code):
+            """Return the response, remembering it for idempotent retries"""
+            if idempotency_key and fingerprint:
+                if status_code < 300:
+                    store_idempotent_response(idempotency_key, fingerprint, body, status_code)
+                else:
+                    release_idempotency_key(idempotency_key)
+            return jsonify(body), status_code
+        
         try:
             # Get request data
             data = request.get_json()
             if not data:
                 return jsonify({'error': 'No data provided'}), 400
             
+            # Replay or reject retries carrying an Idempotency-Key
+            if idempotency_key:
+                if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                    return jsonify({'error': 'Idempotency-Key too long'}), 400
+                
+                request_fingerprint = fingerprint_payload(data)
+                state, record = claim_idempotency_key(idempotency_key, request_fingerprint)
+                if state == 'replay':
+                    logger.info(f"Replaying stored response for Idempotency-Key {idempotency_key}")
+                    response = jsonify(record['body'])
+                    response.headers['Idempotent-Replayed'] = 'true'
+                    return response, record['status_code']
+                if state == 'in_progress':
+                    return jsonify({'error': 'A request with this Idempotency-Key is already in progress'}), 409
+                if state == 'mismatch':
+                    return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+                fingerprint = request_fingerprint
+            
             # Validate input data
             is_valid, errors, validated_data = validate_order_data(data)
             if not is_valid:
-                return jsonify({'error': 'Validation failed', 'details': errors}), 400
+                return respond({'error': 'Validation failed', 'details': errors}, 400)
             
             # Generate unique merchant_ref if not provided
             merchant_ref = validated_data.get('merchant_ref')
@@ -91,17 +194,26 @@ def create_app(config_name=None):
                 merchant_ref = f"INV-{int(time.time())}"
             
             # Get package information
-            packages = app.config['PACKAGES']
-            package = packages.get(validated_data['package_id'])
+            package = get_package(validated_data['package_id'])
             
             if not package:
-                return jsonify({'error': 'Invalid package_id'}), 400
+                return respond({'error': 'Invalid package_id'}, 400)
             
             # Get amount from server-side package (security)
-            amount = package['price']
+            amount = int(package['price'])
             
             # Get payment method
             payment_method = validated_data.get('payment_method', 'QRIS')
+            if not is_supported_payment_method(payment_method):
+                return respond({'error': f'Unsupported payment_method: {payment_method}'}, 400)
+            
+            # Reuse an unexpired checkout instead of opening a second transaction
+            existing_order = find_reusable_pending_order(
+                validated_data['customer_email'], validated_data['package_id'], payment_method
+            )
+            if existing_order:
+                logger.info(f"Reusing pending order {existing_order.order_id} for {existing_order.customer_email}")
+                return respond(build_order_response(existing_order), 200)
             
             # Create order record
             order = Order(
@@ -135,61 +247,150 @@ def create_app(config_name=None):
             if not payment_result.get('success', False):
                 db.session.rollback()
                 logger.error(f"Tripay error: {payment_result.get('error', 'Unknown error')}")
-                return jsonify({
+                return respond({
                     'error': payment_result.get('error', 'Payment gateway error'),
                     'details': payment_result.get('details', {})
-                }), 500
+                }, 500)
             
             # Update order with Tripay transaction details
             order.checkout_url = payment_result.get('checkout_url')
             order.payment_method = payment_result.get('payment_method')
             order.reference = payment_result.get('reference')
+            order.qr_string = payment_result.get('qr_string')
+            if payment_result.get('expired_time'):
+                order.expired_at = datetime.utcfromtimestamp(int(payment_result['expired_time']))
             
+            record_order_created(order)
             db.session.commit()
+            cache_order_status(order)
+            schedule_order_expiry(order.order_id, order.expired_at or order.created_at + timedelta(hours=24))
             
             logger.info(f"Order created successfully: {merchant_ref}")
             
-            return jsonify({
-                'success': True,
-                'order_id': merchant_ref,
-                'reference': payment_result.get('reference'),
-                'checkout_url': payment_result.get('checkout_url'),
-                'qr_string': payment_result.get('qr_string'),
-                'payment_method': payment_result.get('payment_method'),
-                'amount': amount,
-                'status': 'pending_payment'
-            }), 201
+            return respond(build_order_response(order), 201)
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error creating order: {str(e)}")
-            return jsonify({'error': 'Internal server error'}), 500
+            return respond({'error': 'Internal server error'}, 500)
     
     @app.route('/api/orders/<order_id>/status', methods=['GET'])
     @limiter.limit("30 per minute")
+    @read_replica
     def get_order_status(order_id):
         """Get order status"""
         try:
-            order = Order.query.filter_by(order_id=order_id).first()
+            payload = get_cached_order_status(order_id)
+            if payload is None:
+                from_replica = reading_from_replica(db.session)
+                order, _ = find_order(order_id)
+                if order:
+                    payload = cache_order_status(order, if_newer=from_replica)
+                else:
+                    cache_missing_order_status(order_id)
+                    payload = NOT_FOUND_MARKER
+            
+            if payload == NOT_FOUND_MARKER:
+                return jsonify({'error': 'Order not found'}), 404
             
+            poll_after = compute_poll_after(payload)
+            response = jsonify(dict(payload, poll_after=poll_after))
+            response.set_etag(status_etag(payload))
+            response.headers['Cache-Control'] = 'no-cache'  # Always revalidate with If-None-Match
+            if poll_after:
+                response.headers['Retry-After'] = str(poll_after)
+            return response.make_conditional(request)
+            
+        except Exception as e:
+            logger.error(f"Error getting order status: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    @app.route('/api/orders/status:batch', methods=['POST'])
+    @limiter.limit("10 per minute")
+    @read_replica
+    def get_order_status_batch():
+        """Get the status of several orders in one request"""
+        try:
+            data = request.get_json(silent=True) or {}
+            order_ids = data.get('order_ids')
+            max_batch = app.config.get('ORDER_STATUS_BATCH_MAX', 100)
+            
+            if not isinstance(order_ids, list) or not order_ids:
+                return jsonify({'error': 'order_ids must be a non-empty list'}), 400
+            if len(order_ids) > max_batch:
+                return jsonify({'error': f'At most {max_batch} order_ids per request'}), 400
+            if not all(isinstance(order_id, str) and order_id for order_id in order_ids):
+                return jsonify({'error': 'order_ids must be strings'}), 400
+            
+            statuses = get_order_statuses(list(dict.fromkeys(order_ids)))
+            
+            orders = {}
+            not_found = []
+            for order_id, payload in statuses.items():
+                if payload == NOT_FOUND_MARKER:
+                    not_found.append(order_id)
+                else:
+                    orders[order_id] = {
+                        'payment_status': payload['payment_status'],
+                        'invitation_status': payload['invitation_status'],
+                        'updated_at': payload.get('updated_at')
+                    }
+            
+            return jsonify({'orders': orders, 'not_found': not_found})
+            
+        except Exception as e:
+            logger.error(f"Error getting batch order status: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    @app.route('/api/orders/<order_id>/events', methods=['GET'])
+    @limiter.limit("10 per minute")
+    def stream_order_events(order_id):
+        """Stream order status changes as Server-Sent Events"""
+        if not order_stream_slots.acquire(blocking=False):
+            # Clients fall back to polling the status endpoint
+            return jsonify({'error': 'Too many open status streams'}), 503, {'Retry-After': '30'}
+        
+        try:
+            # Subscribe before reading the order so no change can slip in between.
+            # The read goes to the primary: a lagging replica could miss a change published just before.
+            try:
+                pubsub = subscribe_order_status(order_id)
+            except redis.RedisError as e:
+                order_stream_slots.release()
+                logger.warning(f"Status stream unavailable, clients should poll: {str(e)}")
+                return jsonify({'error': 'Status stream unavailable'}), 503
+            
+            order, _ = find_order(order_id)
             if not order:
+                pubsub.close()
+                order_stream_slots.release()
                 return jsonify({'error': 'Order not found'}), 404
             
-            # Generate status message
-            message = generate_status_message(order)
+            initial_payload = build_status_payload(order)
+            # Release the DB connection, the stream itself only talks to Redis
+            db.session.remove()
             
-            return jsonify({
-                'order_id': order.order_id,
-                'payment_status': order.payment_status,
-                'invitation_status': order.invitation_status,
-                'message': message
-            })
+            stream = stream_order_status(
+                pubsub,
+                initial_payload,
+                max_duration=app.config.get('ORDER_EVENTS_MAX_DURATION', 300),
+                keepalive_interval=app.config.get('ORDER_EVENTS_KEEPALIVE', 15),
+                retry_ms=app.config.get('ORDER_EVENTS_RETRY_MS', 3000)
+            )
+            response = app.response_class(stream, mimetype='text/event-stream')
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+            # Runs when the server closes the response, even if the client left before the first event
+            response.call_on_close(order_stream_slots.release)
+            return response
             
         except Exception as e:
-            logger.error(f"Error getting order status: {str(e)}")
+            order_stream_slots.release()
+            logger.error(f"Error streaming order status: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
     @app.route('/api/payment/webhook', methods=['POST'])
+    @require_webhook_signature
     def tripay_callback():
         """Handle Tripay payment callback"""
         try:
@@ -199,141 +400,241 @@ def create_app(config_name=None):
                 logger.error("No callback data received from Tripay")
                 return jsonify({'error': 'No data'}), 400
             
-            # Log callback data (without signature for security)
+            # Signature and source were checked by require_webhook_signature
             safe_data = {k: v for k, v in webhook_data.items() if k != 'signature'}
             logger.info(f"Tripay callback received: {safe_data}")
             
-            # Verify webhook signature
-            tripay_client = get_tripay_client()
-            
             merchant_ref = webhook_data.get('merchant_ref')
             reference = webhook_data.get('reference')
             status = webhook_data.get('status')
-            total_amount = webhook_data.get('total_amount', webhook_data.get('amount'))
             
             if not all([merchant_ref, reference, status]):
                 logger.error("Missing required callback fields")
                 return jsonify({'error': 'Missing required fields'}), 400
             
-            # Verify signature
-            if not tripay_client.verify_callback_signature(webhook_data):
-                logger.error(f"Invalid callback signature for order {merchant_ref}")
-                logger.error(f"Callback body: {safe_data}")
-                return jsonify({'error': 'Invalid signature'}), 401
+            # Journal the callback and ack; orders are updated in the background
+            event = record_webhook_event(webhook_data)
+            if event is None:
+                logger.info(f"Duplicate Tripay callback ignored: {reference}/{status}")
+                return jsonify({'success': True, 'duplicate': True}), 200
             
-            # Find order
-            order = Order.query.filter_by(order_id=merchant_ref).first()
-            if not order:
-                logger.error(f"Order not found: {merchant_ref}")
-                return jsonify({'error': 'Order not found'}), 404
-            
-            # Map Tripay status to our internal status
-            status_mapping = {
-                'PAID': 'paid',
-                'EXPIRED': 'expired',
-                'FAILED': 'failed',
-                'UNPAID': 'pending'
-            }
-            
-            new_status = status_mapping.get(status, 'pending')
-            old_status = order.payment_status
-            
-            # Update order status
-            order.payment_status = new_status
-            order.updated_at = datetime.utcnow()
-            
-            # If payment is successful, trigger invitation process
-            if new_status == 'paid' and old_status != 'paid':
-                order.invitation_status = 'processing'
-                
-                # Send payment confirmation email
-                try:
-                    send_payment_confirmation(order)
-                except Exception as e:
-                    logger.error(f"Failed to send payment confirmation: {str(e)}")
-                
-                # Trigger invitation task
-                if celery:
-                    try:
-                        from tasks import process_invitation_task
-                        process_invitation_task.delay(order.id)
-                        logger.info(f"Invitation task queued for order {merchant_ref}")
-                    except Exception as e:
-                        logger.error(f"Failed to queue invitation task: {str(e)}")
-                        order.invitation_status = 'failed'
-                else:
-                    logger.info(f"Celery disabled, invitation task not queued for order {merchant_ref}")
-            
-            db.session.commit()
-            
-            logger.info(f"Tripay callback processed successfully for order {merchant_ref}: {old_status} -> {new_status}")
+            kick_webhook_processing()
             
             return jsonify({'success': True}), 200
             
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Tripay callback processing error: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
     @app.route('/callback/tripay', methods=['POST'])
     def tripay_callback_endpoint():
-        """Tripay callback endpoint with proper path"""
+        """Tripay callback endpoint with proper path, verified inside tripay_callback"""
         return tripay_callback()
     
     @app.route('/api/packages', methods=['GET'])
     def get_packages():
         """Get available packages"""
         try:
-            packages = app.config['PACKAGES']
-            return jsonify({'packages': packages})
+            catalog = get_package_catalog()
+            response = app.response_class(catalog['body'], mimetype='application/json')
+            response.set_etag(catalog['etag'])
+            response.headers['Cache-Control'] = f"public, max-age={app.config.get('PACKAGES_CLIENT_MAX_AGE', 60)}"
+            return response.make_conditional(request)
         except Exception as e:
             logger.error(f"Error getting packages: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
+    @app.route('/api/payment-channels', methods=['GET'])
+    def get_payment_channel_catalog():
+        """Get payment channels enabled on the Tripay merchant account"""
+        try:
+            channels = get_active_payment_channels()
+            if channels is None:
+                return jsonify({'error': 'Payment channels unavailable'}), 503
+            
+            response = jsonify({'channels': channels})
+            response.headers['Cache-Control'] = f"public, max-age={app.config.get('PAYMENT_CHANNELS_CLIENT_MAX_AGE', 300)}"
+            return response
+        except Exception as e:
+            logger.error(f"Error getting payment channels: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
     @app.route('/api/admin/orders', methods=['GET'])
     @limiter.limit("100 per hour")
+    @read_replica
     def admin_get_orders():
-        """Admin endpoint to get orders (basic implementation)"""
+        """
+        Admin endpoint to list orders, newest first
+        
+        Query args: cursor (from next_cursor), per_page, payment_status,
+        invitation_status, package_id, created_from, created_to, and
+        include_total=true for an exact count of the filtered orders.
+        """
         try:
             # In production, add proper authentication here
-            page = request.args.get('page', 1, type=int)
-            per_page = min(request.args.get('per_page', 20, type=int), 100)
+            max_per_page = app.config.get('ADMIN_ORDERS_MAX_PER_PAGE', 500)
+            per_page = max(1, min(request.args.get('per_page', 20, type=int), max_per_page))
             
-            orders = Order.query.order_by(Order.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            try:
+                conditions = build_order_filters(request.args)
+                rows, next_cursor = list_order_rows(conditions, request.args.get('cursor'), per_page)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
             
-            return jsonify({
-                'orders': [order.to_dict() for order in orders.items],
-                'total': orders.total,
-                'pages': orders.pages,
-                'current_page': page
-            })
+            extra = {'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+            if request.args.get('include_total', '').lower() == 'true':
+                extra['total'] = count_orders(conditions)
+            elif not conditions:
+                extra['estimated_total'] = estimate_order_count()
+            
+            # Column tuples and orjson instead of ORM objects, to_dict() and jsonify
+            return app.response_class(dump_order_listing(rows, **extra), mimetype='application/json')
             
         except Exception as e:
             logger.error(f"Error getting admin orders: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
-    def generate_status_message(order):
-        """Generate human-readable status message"""
-        if order.payment_status == 'pending':
-            return "Menunggu pembayaran. Silakan selesaikan pembayaran sesuai instruksi."
-        elif order.payment_status == 'failed':
-            return "Pembayaran gagal. Silakan coba lagi atau hubungi support."
-        elif order.payment_status == 'expired':
-            return "Pembayaran kedaluwarsa. Silakan buat pesanan baru."
-        elif order.payment_status == 'paid':
-            if order.invitation_status == 'pending':
-                return "Pembayaran berhasil. Proses undangan akan segera dimulai."
-            elif order.invitation_status == 'processing':
-                return "Pembayaran berhasil. Undangan sedang diproses dan akan dikirim dalam 5-30 menit."
-            elif order.invitation_status == 'sent':
-                return f"Undangan ChatGPT Plus telah dikirim ke {order.customer_email}. Silakan cek inbox dan spam folder."
-            elif order.invitation_status == 'failed':
-                return "Pembayaran berhasil, namun ada kendala dalam pengiriman undangan. Tim support akan menghubungi Anda."
-            elif order.invitation_status == 'manual_review_required':
-                return "Pembayaran berhasil. Undangan memerlukan review manual. Tim support akan menghubungi Anda segera."
+    @app.route('/api/admin/orders/export', methods=['GET'])
+    @limiter.limit("10 per hour")
+    @require_admin_token
+    @read_replica
+    def admin_export_orders():
+        """
+        Admin endpoint to stream every order matching the listing filters
+        
+        Query args: format (csv or ndjson), gzip=true for a .gz download, and
+        the filters of the listing. Rows are streamed from a server-side
+        cursor, oldest first, so memory stays flat at any export size.
+        """
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+        try:
+            conditions = build_order_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"orders-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{extension}"
+        chunk_bytes = app.config.get('ORDER_EXPORT_CHUNK_BYTES', 65536)
+        use_gzip = request.args.get('gzip', '').lower() == 'true'
+        if use_gzip:
+            mimetype, filename = 'application/gzip', filename + '.gz'
+        
+        def generate():
+            rows = iter_export_rows(conditions, app.config.get('ORDER_EXPORT_YIELD_PER', 1000))
+            encode = iter_csv if export_format == 'csv' else iter_ndjson
+            chunks = encode(rows, chunk_bytes)
+            if use_gzip:
+                chunks = iter_gzip(chunks)
+            try:
+                yield from chunks
+            except Exception as e:
+                # Headers are already sent, the client sees a truncated download
+                logger.error(f"Order export failed mid-stream: {str(e)}")
+                raise
+        
+        response = app.response_class(stream_with_context(generate()), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+        return response
+    
+    @app.route('/api/admin/stats', methods=['GET'])
+    @limiter.limit("100 per hour")
+    @read_replica
+    def admin_get_stats():
+        """
+        Admin endpoint for sales and invitation stats, read from the daily rollups
         
-        return "Status tidak diketahui. Silakan hubungi support."
+        Query args: from and to (ISO dates, inclusive, default the last 30
+        days) and group_by (day, package_id or payment_method).
+        """
+        try:
+            # In production, add proper authentication here
+            group_by = request.args.get('group_by', 'day')
+            if group_by not in STATS_GROUPS:
+                return jsonify({'error': f"group_by must be one of {', '.join(STATS_GROUPS)}"}), 400
+            try:
+                end = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow().date()
+                start = date.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=29)
+            except ValueError:
+                return jsonify({'error': 'from and to must be ISO dates'}), 400
+            
+            return jsonify({
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'group_by': group_by,
+                'stats': get_order_stats(start, end, group_by)
+            })
+            
+        except Exception as e:
+            logger.error(f"Error getting admin stats: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    @app.route('/api/admin/orders/<order_id>', methods=['GET'])
+    @limiter.limit("100 per hour")
+    @read_replica
+    def admin_get_order(order_id):
+        """Admin endpoint to get one order with its invitation logs, including archived orders"""
+        try:
+            # In production, add proper authentication here
+            order, archived = find_order(order_id)
+            if not order:
+                return jsonify({'error': 'Order not found'}), 404
+            
+            return jsonify({
+                'order': order.to_dict(),
+                'invitation_logs': [log.to_dict() for log in order.invitation_logs],
+                'archived': archived
+            })
+            
+        except Exception as e:
+            logger.error(f"Error getting admin order {order_id}: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    def kick_webhook_processing():
+        """Process journaled callbacks now instead of waiting for the periodic run"""
+        if celery:
+            from tasks import kick_webhook_processing as queue_processing
+            queue_processing()
+        else:
+            def drain():
+                from tasks import drain_webhook_events, drain_outbox
+                with app.app_context():
+                    try:
+                        drain_webhook_events()
+                        drain_outbox()
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Webhook event processing failed: {str(e)}")
+            
+            threading.Thread(target=drain, name='webhook-events', daemon=True).start()
+    
+    def find_reusable_pending_order(customer_email, package_id, payment_method):
+        """Find an unpaid order whose Tripay checkout is still valid for a while"""
+        min_expiry = datetime.utcnow() + timedelta(seconds=app.config.get('PENDING_ORDER_REUSE_MARGIN', 300))
+        return Order.query.filter(
+            Order.customer_email == customer_email,
+            Order.package_id == package_id,
+            Order.payment_method == payment_method,
+            Order.payment_status == 'pending',
+            Order.checkout_url.isnot(None),
+            Order.expired_at > min_expiry
+        ).order_by(Order.created_at.desc()).first()
+    
+    def build_order_response(order):
+        """Build the create-order response body for an order with a Tripay checkout"""
+        return {
+            'success': True,
+            'order_id': order.order_id,
+            'reference': order.reference,
+            'checkout_url': order.checkout_url,
+            'qr_string': order.qr_string,
+            'payment_method': order.payment_method,
+            'amount': int(order.amount),
+            'status': 'pending_payment'
+        }
     
     @app.errorhandler(404)
     def not_found(error):
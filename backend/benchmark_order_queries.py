@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Query plan benchmark for the hot order queries
+Usage:
+  python benchmark_order_queries.py seed [rows]    # Insert synthetic orders (default 1000000)
+  python benchmark_order_queries.py explain        # Plans and timings with the current indexes
+  python benchmark_order_queries.py compare        # Without/with the composite and partial indexes
+  python benchmark_order_queries.py serialize      # Admin listing: ORM + to_dict() vs column tuples + orjson
+
+Runs against DATABASE_URL using FLASK_ENV (default development). compare
+drops and recreates indexes, only point it at a scratch database.
+Plans use EXPLAIN ANALYZE on PostgreSQL and MySQL 8, EXPLAIN QUERY PLAN on SQLite.
+serialize reports median milliseconds per page, including the query.
+"""
+
+import os
+import sys
+import time
+import random
+import statistics
+import importlib.util
+from datetime import datetime, timedelta
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import json
+from sqlalchemy import Column, Index, MetaData, Table, inspect, insert, text
+
+from app import create_app
+from models import db, Order, InvitationLog
+from utils.order_listing import encode_cursor, list_order_rows, dump_order_listing
+
+INDEX_MIGRATION = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'migrations', 'versions', '3f2a9c1d7b40_composite_order_indexes.py')
+
+# (payment_status, invitation_status, share of orders)
+STATUS_MIX = [
+    ('paid', 'sent', 0.86),
+    ('expired', 'pending', 0.08),
+    ('pending', 'pending', 0.03),
+    ('paid', 'failed', 0.01),
+    ('paid', 'processing', 0.01),
+    ('failed', 'pending', 0.01),
+]
+
+def hot_queries(now):
+    """The queries behind the expiry sweep, reconciliation, retries and admin listing"""
+    return [
+        ('expiry sweep', """
+            SELECT id FROM orders
+            WHERE payment_status = 'pending' AND created_at < :cutoff
+            ORDER BY created_at LIMIT 500
+        """, {'cutoff': now - timedelta(hours=24)}),
+        ('payment reconciliation', """
+            SELECT order_id, reference, payment_status FROM orders
+            WHERE payment_status = 'pending' AND created_at >= :since AND created_at < :until
+              AND reference IS NOT NULL
+            ORDER BY created_at LIMIT 200
+        """, {'since': now - timedelta(hours=24), 'until': now - timedelta(minutes=2)}),
+        ('reconciliation, expired', """
+            SELECT order_id, reference, payment_status FROM orders
+            WHERE invitation_status = 'pending' AND payment_status = 'expired' AND updated_at >= :since
+              AND reference IS NOT NULL
+            ORDER BY updated_at LIMIT 200
+        """, {'since': now - timedelta(hours=1)}),
+        ('failed invitation retries', """
+            SELECT orders.id, orders.order_id FROM orders
+            LEFT OUTER JOIN invitation_logs ON invitation_logs.order_id = orders.id
+            WHERE orders.invitation_status = 'failed' AND orders.payment_status = 'paid'
+              AND orders.updated_at > :cutoff
+            GROUP BY orders.id, orders.order_id
+            HAVING count(invitation_logs.id) < 5
+        """, {'cutoff': now - timedelta(hours=6)}),
+        ('admin listing, first page', """
+            SELECT * FROM orders ORDER BY created_at DESC, id DESC LIMIT 21
+        """, {}),
+        ('admin listing, deep page', """
+            SELECT * FROM orders
+            WHERE created_at <= :cursor AND (created_at < :cursor OR id < :cursor_id)
+            ORDER BY created_at DESC, id DESC LIMIT 21
+        """, {'cursor': now - timedelta(days=300), 'cursor_id': 1}),
+        ('admin listing, filtered', """
+            SELECT * FROM orders WHERE payment_status = 'expired'
+            ORDER BY created_at DESC, id DESC LIMIT 21
+        """, {}),
+    ]
+
+def seed(rows, batch_size=10000):
+    """Insert synthetic orders spread over the last year, plus invitation logs for failed ones"""
+    now = datetime.utcnow()
+    statuses = [(payment, invitation) for payment, invitation, _ in STATUS_MIX]
+    weights = [share for _, _, share in STATUS_MIX]
+    offset = Order.query.count()
+
+    for start in range(0, rows, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, rows)):
+            payment_status, invitation_status = random.choices(statuses, weights)[0]
+            if payment_status == 'pending':
+                created_at = now - timedelta(seconds=random.randint(60, 3 * 86400))
+            else:
+                created_at = now - timedelta(seconds=random.randint(60, 365 * 86400))
+            updated_at = created_at + timedelta(seconds=random.randint(0, 3600))
+            batch.append({
+                'order_id': f'BENCH-{offset + i}',
+                'customer_email': f'user{random.randint(1, rows // 3 + 1)}@example.com',
+                'package_id': random.choice(['chatgpt_plus_1_month', 'chatgpt_plus_3_months']),
+                'amount': 25000,
+                'payment_status': payment_status,
+                'invitation_status': invitation_status,
+                'payment_method': 'QRIS',
+                'reference': f'DEV-T{offset + i}',
+                'created_at': created_at,
+                'updated_at': updated_at
+            })
+        db.session.execute(insert(Order), batch)
+        db.session.commit()
+        print(f"  {min(start + batch_size, rows)}/{rows} orders")
+
+    failed_ids = db.session.execute(
+        text("SELECT id FROM orders WHERE invitation_status = 'failed' AND order_id LIKE 'BENCH-%'")
+    ).scalars().all()
+    logs = [{'order_id': order_pk, 'status': 'failure', 'attempt_timestamp': now}
+            for order_pk in failed_ids for _ in range(random.randint(1, 6))]
+    for start in range(0, len(logs), batch_size):
+        db.session.execute(insert(InvitationLog), logs[start:start + batch_size])
+    db.session.commit()
+    print(f"Seeded {rows} orders and {len(logs)} invitation logs.")
+
+def analyze_tables():
+    """Refresh planner statistics so plans reflect the seeded data"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        db.session.execute(text('ANALYZE orders'))
+        db.session.execute(text('ANALYZE invitation_logs'))
+    elif dialect == 'mysql':
+        db.session.execute(text('ANALYZE TABLE orders, invitation_logs'))
+    else:
+        db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+def explain(label):
+    """Print the plan and median runtime of every hot query"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    elif dialect == 'mysql':
+        prefix = 'EXPLAIN ANALYZE '
+    else:
+        prefix = 'EXPLAIN QUERY PLAN '
+
+    print(f"\n===== {label} =====")
+    results = {}
+    for name, sql, params in hot_queries(datetime.utcnow()):
+        plan = db.session.execute(text(prefix + sql), params).all()
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            db.session.execute(text(sql), params).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+
+        print(f"\n--- {name}: median {results[name]:.2f} ms over 5 runs")
+        for row in plan:
+            print('  ' + ' | '.join(str(column) for column in row))
+    db.session.rollback()
+    return results
+
+def benchmark_indexes():
+    """The indexes the composite index migration defines, on a scratch copy of the orders table"""
+    spec = importlib.util.spec_from_file_location('composite_order_indexes', INDEX_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    # Columns are only needed by name, and a separate MetaData keeps the models untouched
+    columns = {column for _, names in migration.COMPOSITE_INDEXES for column in names}
+    columns |= {column for _, names, _ in migration.PARTIAL_INDEXES for column in names}
+    table = Table('orders', MetaData(), *[Column(name) for name in sorted(columns)])
+
+    indexes = [Index(name, *[table.c[column] for column in names])
+               for name, names in migration.COMPOSITE_INDEXES]
+    if db.engine.dialect.name == 'postgresql':
+        indexes += [Index(name, *[table.c[column] for column in names], postgresql_where=text(where))
+                    for name, names, where in migration.PARTIAL_INDEXES]
+    return indexes
+
+def compare():
+    """
+    Run the hot queries without and then with the composite and partial indexes
+
+    The indexes are dropped and created directly, so the alembic_version of
+    the database, if it has one, is left alone.
+    """
+    indexes = benchmark_indexes()
+    existing = {index['name'] for index in inspect(db.engine).get_indexes('orders')}
+    for index in indexes:
+        if index.name in existing:
+            index.drop(db.engine)
+    analyze_tables()
+    before = explain('before: without composite indexes')
+
+    for index in indexes:
+        index.create(db.engine)
+    analyze_tables()
+    after = explain('after: with composite indexes')
+
+    print(f"\n{'Query':<28} {'Before (ms)':>12} {'After (ms)':>12}")
+    print("-" * 54)
+    for name in before:
+        print(f"{name:<28} {before[name]:>12.2f} {after[name]:>12.2f}")
+
+def serialize(runs=20):
+    """Time one admin listing page, from query to response bytes, through both code paths"""
+    def orm_path(per_page):
+        orders = Order.query.order_by(Order.created_at.desc(), Order.id.desc()).limit(per_page + 1).all()
+        next_cursor = encode_cursor(orders[per_page - 1]) if len(orders) > per_page else None
+        orders = orders[:per_page]
+        body = json.dumps({'orders': [order.to_dict() for order in orders], 'next_cursor': next_cursor,
+                           'has_more': next_cursor is not None})
+        db.session.expunge_all()  # Identity map hits would flatter repeated runs
+        return body
+
+    def projection_path(per_page):
+        rows, next_cursor = list_order_rows([], None, per_page)
+        return dump_order_listing(rows, next_cursor=next_cursor, has_more=next_cursor is not None)
+
+    print(f"\n{'per_page':>8} {'ORM + to_dict (ms)':>20} {'Tuples + orjson (ms)':>22} {'Speedup':>8}")
+    print("-" * 62)
+    for per_page in (20, 100, 500):
+        medians = []
+        for path in (orm_path, projection_path):
+            path(per_page)  # Warm up
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                path(per_page)
+                timings.append((time.perf_counter() - started) * 1000)
+            medians.append(statistics.median(timings))
+        print(f"{per_page:>8} {medians[0]:>20.2f} {medians[1]:>22.2f} {medians[0] / medians[1]:>7.1f}x")
+    db.session.rollback()
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        command = sys.argv[1].lower()
+
+        if command == 'seed':
+            try:
+                rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+            except ValueError:
+                print("Rows must be a number")
+                return
+            seed(rows)
+            analyze_tables()
+        elif command == 'explain':
+            explain('current indexes')
+        elif command == 'compare':
+            compare()
+        elif command == 'serialize':
+            serialize()
+        else:
+            print(f"Unknown command: {command}")
+            print(__doc__)
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,14 @@ Run with: celery -A celery_worker.celery worker --loglevel=info
 """
 
 import os
+import sys
+
+# Size the database pool for this process before the config is loaded
+os.environ.setdefault('PROCESS_ROLE', 'beat' if 'beat' in sys.argv else 'worker')
+
+from celery.signals import worker_process_init
 from app import create_app
+from models import db
 from tasks import make_celery
 
 # Create Flask app
@@ -14,5 +21,13 @@ flask_app = create_app(os.environ.get('FLASK_ENV', 'development'))
 # Create Celery instance
 celery = make_celery(flask_app)
 
+@worker_process_init.connect
+def dispose_inherited_engines(**kwargs):
+    """Drop pooled connections inherited from the parent, a forked child must open its own"""
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's sockets alone instead of closing them from the child
+            engine.dispose(close=False)
+
 if __name__ == '__main__':
     celery.start()
@@ -16,6 +16,24 @@ class Config:
         raise ValueError("DATABASE_URL environment variable is required")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optional read replica for read-only endpoints (status polling, admin listing)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    
+    # Database Connection Pools, sized per process role so the total stays under max_connections:
+    # 4 gunicorn workers x (8 + 8) + 2 Celery children x (2 + 1) + beat (1) = 71 of PostgreSQL's default 100
+    PROCESS_ROLE = os.environ.get('PROCESS_ROLE', 'web')  # web, worker or beat (set by celery_worker.py)
+    DB_POOL_SIZES = {  # role -> (pool_size, max_overflow)
+        'web': (int(os.environ.get('DB_POOL_SIZE_WEB', '8')), int(os.environ.get('DB_MAX_OVERFLOW_WEB', '8'))),
+        'worker': (int(os.environ.get('DB_POOL_SIZE_WORKER', '2')), int(os.environ.get('DB_MAX_OVERFLOW_WORKER', '1'))),
+        'beat': (1, 0),
+    }
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '10'))  # Max wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))  # Below MySQL wait_timeout and LB idle cutoffs
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_SLOW_CHECKOUT_MS = int(os.environ.get('DB_POOL_SLOW_CHECKOUT_MS', '100'))  # Logged as a warning
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() == 'true'  # PgBouncer in transaction mode
+    
     # Payment Gateway (Tripay) - All required
     TRIPAY_API_KEY = os.environ.get('TRIPAY_API_KEY')
     TRIPAY_MERCHANT_CODE = os.environ.get('TRIPAY_MERCHANT_CODE')
@@ -49,6 +67,10 @@ class Config:
     # Redis Configuration
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     
+    # Cache Configuration (falls back to the Celery Redis instance)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or REDIS_URL
+    CACHE_SOCKET_TIMEOUT = float(os.environ.get('CACHE_SOCKET_TIMEOUT', '0.5'))
+    
     # Celery Configuration
     CELERY_BROKER_URL = REDIS_URL
     CELERY_RESULT_BACKEND = REDIS_URL
@@ -72,13 +94,21 @@ class Config:
     
     # Security
     WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
-    ALLOWED_WEBHOOK_IPS = os.environ.get('ALLOWED_WEBHOOK_IPS', '').split(',')
+    ALLOWED_WEBHOOK_IPS = os.environ.get('ALLOWED_WEBHOOK_IPS', '').split(',')  # Empty allows all
+    # X-Real-IP is only honored from these (our nginx)
+    TRUSTED_PROXY_IPS = os.environ.get('TRUSTED_PROXY_IPS', '127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16').split(',')
+    WEBHOOK_MAX_BODY_BYTES = int(os.environ.get('WEBHOOK_MAX_BODY_BYTES', '16384'))
+    # Bearer token for the admin endpoints that expose customer data; unset disables them
+    ADMIN_API_TOKEN = os.environ.get('ADMIN_API_TOKEN')
     
     # Selenium Configuration
     CHROME_BINARY_PATH = os.environ.get('CHROME_BINARY_PATH')
     CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH')
     SELENIUM_HEADLESS = os.environ.get('SELENIUM_HEADLESS', 'true').lower() == 'true'
     SELENIUM_TIMEOUT = int(os.environ.get('SELENIUM_TIMEOUT', '30'))
+    INVITATION_LEASE_SECONDS = int(os.environ.get('INVITATION_LEASE_SECONDS', '900'))  # Max length of one invitation run
+    INVITATION_MAX_ATTEMPTS = int(os.environ.get('INVITATION_MAX_ATTEMPTS', '5'))  # Logged attempts before retries stop
+    INVITATION_RETRY_SPREAD = int(os.environ.get('INVITATION_RETRY_SPREAD', '3600'))  # Seconds to spread a retry batch over
     
     # Rate Limiting
     RATELIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL') or 'redis://localhost:6379/1'
@@ -86,6 +116,71 @@ class Config:
     # Celery Configuration
     ENABLE_CELERY = os.environ.get('ENABLE_CELERY', 'false').lower() == 'true'
     
+    # Order Submission
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', '86400'))  # Stored responses
+    IDEMPOTENCY_LOCK_TTL = int(os.environ.get('IDEMPOTENCY_LOCK_TTL', '60'))  # In-flight claim
+    PENDING_ORDER_REUSE_MARGIN = int(os.environ.get('PENDING_ORDER_REUSE_MARGIN', '300'))  # Min seconds left to reuse a checkout
+    
+    # Payment Channel Catalog (Tripay /merchant/payment-channel)
+    PAYMENT_CHANNELS_TTL = int(os.environ.get('PAYMENT_CHANNELS_TTL', '3600'))  # Fresh for
+    PAYMENT_CHANNELS_STALE_TTL = int(os.environ.get('PAYMENT_CHANNELS_STALE_TTL', '86400'))  # Served stale while refreshing
+    PAYMENT_CHANNELS_REFRESH_LOCK_TTL = int(os.environ.get('PAYMENT_CHANNELS_REFRESH_LOCK_TTL', '30'))
+    PAYMENT_CHANNELS_FETCH_TIMEOUT = float(os.environ.get('PAYMENT_CHANNELS_FETCH_TIMEOUT', '5'))  # Seconds
+    PAYMENT_CHANNELS_FAILURE_TTL = int(os.environ.get('PAYMENT_CHANNELS_FAILURE_TTL', '30'))  # Skip refetching after a failure
+    PAYMENT_CHANNELS_CLIENT_MAX_AGE = int(os.environ.get('PAYMENT_CHANNELS_CLIENT_MAX_AGE', '300'))
+    
+    # Order Status Cache
+    ORDER_STATUS_CACHE_TTL = int(os.environ.get('ORDER_STATUS_CACHE_TTL', '120'))
+    ORDER_STATUS_NEGATIVE_TTL = int(os.environ.get('ORDER_STATUS_NEGATIVE_TTL', '30'))  # Unknown order ids
+    ORDER_STATUS_BATCH_MAX = int(os.environ.get('ORDER_STATUS_BATCH_MAX', '100'))
+    
+    # Order Status Stream (Server-Sent Events)
+    ORDER_EVENTS_MAX_DURATION = int(os.environ.get('ORDER_EVENTS_MAX_DURATION', '300'))  # Client reconnects after this
+    ORDER_EVENTS_KEEPALIVE = int(os.environ.get('ORDER_EVENTS_KEEPALIVE', '15'))
+    ORDER_EVENTS_RETRY_MS = int(os.environ.get('ORDER_EVENTS_RETRY_MS', '3000'))
+    ORDER_EVENTS_MAX_STREAMS = int(os.environ.get('ORDER_EVENTS_MAX_STREAMS', '16'))  # Per worker process, keep below gunicorn --threads
+    
+    # Outbox Relay
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '100'))
+    OUTBOX_MAX_BATCHES = int(os.environ.get('OUTBOX_MAX_BATCHES', '10'))  # Per relay run
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '10'))  # Then kept as a dead letter
+    OUTBOX_CLAIM_SECONDS = int(os.environ.get('OUTBOX_CLAIM_SECONDS', '600'))  # Other relays skip claimed events this long
+    
+    # Webhook Event Journal
+    WEBHOOK_EVENT_BATCH_SIZE = int(os.environ.get('WEBHOOK_EVENT_BATCH_SIZE', '100'))
+    WEBHOOK_EVENT_MAX_BATCHES = int(os.environ.get('WEBHOOK_EVENT_MAX_BATCHES', '10'))  # Per processing run
+    WEBHOOK_EVENT_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_EVENT_MAX_ATTEMPTS', '5'))
+    
+    # Payment Reconciliation (catches orders whose Tripay callback was lost)
+    RECONCILE_MIN_AGE = int(os.environ.get('RECONCILE_MIN_AGE', '120'))  # Give the callback a chance first
+    RECONCILE_MAX_AGE = int(os.environ.get('RECONCILE_MAX_AGE', str(24 * 3600)))  # Matches the expiry cutoff
+    RECONCILE_EXPIRED_WINDOW = int(os.environ.get('RECONCILE_EXPIRED_WINDOW', '3600'))  # Recent expiries to recheck, 0 disables
+    RECONCILE_BATCH_LIMIT = int(os.environ.get('RECONCILE_BATCH_LIMIT', '200'))  # Orders per run
+    RECONCILE_CONCURRENCY = int(os.environ.get('RECONCILE_CONCURRENCY', '4'))
+    RECONCILE_RATE_PER_SECOND = float(os.environ.get('RECONCILE_RATE_PER_SECOND', '5'))
+    TRIPAY_POOL_SIZE = int(os.environ.get('TRIPAY_POOL_SIZE', '8'))
+    
+    # Order Expiry (per-order schedule, the hourly sweep is the backstop)
+    EXPIRY_TICK_BATCH_SIZE = int(os.environ.get('EXPIRY_TICK_BATCH_SIZE', '200'))
+    EXPIRY_SWEEP_CHUNK_SIZE = int(os.environ.get('EXPIRY_SWEEP_CHUNK_SIZE', '500'))
+    EXPIRY_SWEEP_MAX_CHUNKS = int(os.environ.get('EXPIRY_SWEEP_MAX_CHUNKS', '50'))  # Per run, the next run continues
+    EXPIRY_SWEEP_LOCK_TTL = int(os.environ.get('EXPIRY_SWEEP_LOCK_TTL', '600'))
+    
+    # Order Archival (completed orders move to orders_archive, still reachable by order_id)
+    ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', '180'))
+    ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', '500'))
+    ORDER_ARCHIVE_MAX_BATCHES = int(os.environ.get('ORDER_ARCHIVE_MAX_BATCHES', '100'))  # Per run, the next run continues
+    ORDER_ARCHIVE_LOCK_TTL = int(os.environ.get('ORDER_ARCHIVE_LOCK_TTL', '3600'))
+    
+    # Admin Order Listing
+    ADMIN_ORDERS_MAX_PER_PAGE = int(os.environ.get('ADMIN_ORDERS_MAX_PER_PAGE', '500'))
+    ORDER_EXPORT_YIELD_PER = int(os.environ.get('ORDER_EXPORT_YIELD_PER', '1000'))  # Rows fetched per round trip
+    ORDER_EXPORT_CHUNK_BYTES = int(os.environ.get('ORDER_EXPORT_CHUNK_BYTES', '65536'))
+    
+    # Package Catalog (served from the packages table, PACKAGES below only seeds it)
+    PACKAGE_CATALOG_TTL = int(os.environ.get('PACKAGE_CATALOG_TTL', '300'))  # Safety net if an invalidation is missed
+    PACKAGES_CLIENT_MAX_AGE = int(os.environ.get('PACKAGES_CLIENT_MAX_AGE', '60'))
+    
     # Package Configuration
     PACKAGES = {
         'chatgpt_plus_1_month': {
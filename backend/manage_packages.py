@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Package catalog management script
+Changes are picked up by running API workers without a redeploy.
+Usage:
+  python manage_packages.py list
+  python manage_packages.py set-price chatgpt_plus_1_month 30000
+  python manage_packages.py disable team_package
+  python manage_packages.py enable team_package
+"""
+
+import os
+import sys
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db, Package
+
+def list_packages():
+    """List all packages"""
+    packages = Package.query.order_by(Package.id).all()
+
+    if not packages:
+        print("No packages found.")
+        return
+
+    print(f"{'ID':<25} {'Name':<20} {'Price':>10} {'Active':<8}")
+    print("-" * 70)
+
+    for package in packages:
+        print(f"{package.id:<25} {package.name:<20} {int(package.price):>10} {'Yes' if package.is_active else 'No':<8}")
+
+def set_price(package_id, price):
+    """Change the price of a package"""
+    package = Package.query.get(package_id)
+    if not package:
+        print(f"Package {package_id} not found.")
+        return
+
+    package.price = price
+    db.session.commit()
+
+    print(f"Price of {package_id} set to {price}.")
+
+def set_active(package_id, is_active):
+    """Enable or disable a package"""
+    package = Package.query.get(package_id)
+    if not package:
+        print(f"Package {package_id} not found.")
+        return
+
+    package.is_active = is_active
+    db.session.commit()
+
+    print(f"Package {package_id} {'enabled' if is_active else 'disabled'}.")
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    app = create_app('production')
+
+    with app.app_context():
+        command = sys.argv[1].lower()
+
+        if command == 'list':
+            list_packages()
+        elif command == 'set-price':
+            if len(sys.argv) != 4 or not sys.argv[3].isdigit():
+                print("Usage: python manage_packages.py set-price <package_id> <price>")
+                return
+            set_price(sys.argv[2], int(sys.argv[3]))
+        elif command in ('enable', 'disable'):
+            if len(sys.argv) != 3:
+                print(f"Usage: python manage_packages.py {command} <package_id>")
+                return
+            set_active(sys.argv[2], command == 'enable')
+        else:
+            print(f"Unknown command: {command}")
+            print(__doc__)
+
+if __name__ == '__main__':
+    main()
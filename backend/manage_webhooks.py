@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tripay webhook journal management script
+Usage:
+  python manage_webhooks.py list [--pending]
+  python manage_webhooks.py replay 2024-01-01T00:00 2024-01-02T00:00 [PAID]
+  python manage_webhooks.py process
+
+replay marks every callback received in [since, until) as unprocessed and
+applies them again. Status transitions are conditional, so replaying
+callbacks that were already applied is a no-op.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import WebhookEvent
+from utils.webhook_events import reset_webhook_events
+
+def list_events(pending_only=False):
+    """List the most recent webhook events"""
+    query = WebhookEvent.query
+    if pending_only:
+        query = query.filter(WebhookEvent.processed_at.is_(None))
+    events = query.order_by(WebhookEvent.id.desc()).limit(50).all()
+    
+    if not events:
+        print("No webhook events found.")
+        return
+    
+    print(f"{'ID':<8} {'Reference':<24} {'Status':<8} {'Order':<20} {'Received':<17} {'Processed':<17} {'Tries':<5}")
+    print("-" * 105)
+    
+    for event in events:
+        processed = event.processed_at.strftime('%Y-%m-%d %H:%M') if event.processed_at else 'Pending'
+        print(f"{event.id:<8} {event.reference:<24} {event.status:<8} {event.merchant_ref:<20} "
+              f"{event.received_at.strftime('%Y-%m-%d %H:%M'):<17} {processed:<17} {event.attempts:<5}")
+
+def process_pending():
+    """Apply all unprocessed events and relay the resulting side effects"""
+    from tasks import drain_webhook_events, drain_outbox
+    
+    total = 0
+    while True:
+        processed, changed = drain_webhook_events()
+        total += processed
+        if not processed:
+            break
+    print(f"Processed {total} webhook events.")
+    print(f"Dispatched {drain_outbox()} outbox events.")
+
+def replay(since, until, status=None):
+    """Re-apply webhook events received in a time range"""
+    count = reset_webhook_events(since, until, status)
+    print(f"{count} webhook events queued for replay.")
+    process_pending()
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    
+    app = create_app('production')
+    
+    with app.app_context():
+        command = sys.argv[1].lower()
+        
+        if command == 'list':
+            list_events(pending_only='--pending' in sys.argv[2:])
+        elif command == 'replay':
+            if len(sys.argv) not in (4, 5):
+                print("Usage: python manage_webhooks.py replay <since> <until> [status]")
+                return
+            try:
+                since = datetime.fromisoformat(sys.argv[2])
+                until = datetime.fromisoformat(sys.argv[3])
+            except ValueError:
+                print("Dates must be ISO formatted, e.g. 2024-01-01T00:00 (UTC)")
+                return
+            replay(since, until, sys.argv[4].upper() if len(sys.argv) == 5 else None)
+        elif command == 'process':
+            process_pending()
+        else:
+            print(f"Unknown command: {command}")
+            print(__doc__)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Order checkout and lease columns, outbox and webhook event journal
+
+Revision ID: 1d9e6b3c5a82
+Revises:
+Create Date: 2026-10-19 00:05:00.000000
+
+Brings a database created by db.create_all() before these models changed
+up to date. Columns and tables that already exist are skipped. The new
+order columns are nullable, so adding them is metadata-only on PostgreSQL
+and MySQL 8 (ALGORITHM=INSTANT).
+
+On an empty database there is nothing to bring up to date: the current
+models are created as they are, the way db.create_all() would, and the
+later revisions find their changes already in place and skip them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = '1d9e6b3c5a82'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ORDER_COLUMNS = [
+    ('qr_string', sa.Text()),
+    ('expired_at', sa.DateTime()),
+    ('invitation_locked_until', sa.DateTime()),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('orders'):
+        current_app.extensions['migrate'].db.metadata.create_all(op.get_bind())
+        return
+
+    tables = inspector.get_table_names()
+
+    existing = {column['name'] for column in inspector.get_columns('orders')}
+    for name, column_type in ORDER_COLUMNS:
+        if name not in existing:
+            op.add_column('orders', sa.Column(name, column_type, nullable=True))
+
+    if 'outbox' not in tables:
+        op.create_table(
+            'outbox',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('event_type', sa.String(length=50), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('available_at', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_outbox_available_at', 'outbox', ['available_at'])
+
+    if 'webhook_events' not in tables:
+        op.create_table(
+            'webhook_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('reference', sa.String(length=128), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('merchant_ref', sa.String(length=50), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('received_at', sa.DateTime(), nullable=False),
+            sa.Column('processed_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('reference', 'status', name='uq_webhook_events_reference_status')
+        )
+        op.create_index('ix_webhook_events_received_at', 'webhook_events', ['received_at'])
+        op.create_index('ix_webhook_events_processed_at', 'webhook_events', ['processed_at'])
+
+
+def downgrade():
+    op.drop_table('webhook_events')
+    op.drop_table('outbox')
+    for name, _ in reversed(ORDER_COLUMNS):
+        op.drop_column('orders', name)
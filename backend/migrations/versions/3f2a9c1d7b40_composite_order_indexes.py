@@ -0,0 +1,70 @@
+"""Composite and partial indexes for the hot order queries
+
+Revision ID: 3f2a9c1d7b40
+Revises: 1d9e6b3c5a82
+Create Date: 2026-10-19 00:10:00.000000
+
+Existing databases were created with db.create_all(), so indexes that a
+fresh create_all() already made are skipped. On PostgreSQL the indexes
+are built CONCURRENTLY; MySQL/InnoDB builds them online by default.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b40'
+down_revision = '1d9e6b3c5a82'
+branch_labels = None
+depends_on = None
+
+COMPOSITE_INDEXES = [
+    # Expiry sweep and payment reconciliation
+    ('ix_orders_payment_status_created_at', ['payment_status', 'created_at']),
+    # Admin listing, ORDER BY created_at DESC, id DESC (scanned backwards)
+    ('ix_orders_created_at_id', ['created_at', 'id']),
+    ('ix_orders_invitation_status_created_at', ['invitation_status', 'created_at']),
+    ('ix_orders_package_id_created_at', ['package_id', 'created_at']),
+    # Failed invitation retries
+    ('ix_orders_invitation_payment_updated', ['invitation_status', 'payment_status', 'updated_at']),
+]
+
+# PostgreSQL only: cover just the small, hot slice of the table
+PARTIAL_INDEXES = [
+    ('ix_orders_pending_created_at', ['created_at'], "payment_status = 'pending'"),
+    ('ix_orders_failed_invitations_updated_at', ['updated_at'],
+     "invitation_status = 'failed' AND payment_status = 'paid'"),
+]
+
+
+def _existing_indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('orders')}
+
+
+def upgrade():
+    existing = _existing_indexes()
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    if not is_postgresql:
+        for name, columns in COMPOSITE_INDEXES:
+            if name not in existing:
+                op.create_index(name, 'orders', columns)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, columns in COMPOSITE_INDEXES:
+            if name not in existing:
+                op.create_index(name, 'orders', columns, postgresql_concurrently=True)
+        for name, columns, where in PARTIAL_INDEXES:
+            if name not in existing:
+                op.create_index(name, 'orders', columns, postgresql_where=sa.text(where),
+                                postgresql_concurrently=True)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    names = [name for name, _ in COMPOSITE_INDEXES] + [name for name, _, _ in PARTIAL_INDEXES]
+    for name in names:
+        if name in existing:
+            op.drop_index(name, table_name='orders')
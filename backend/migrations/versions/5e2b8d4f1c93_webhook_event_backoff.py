@@ -0,0 +1,36 @@
+"""Retry backoff for journaled webhook events
+
+Revision ID: 5e2b8d4f1c93
+Revises: c4a7f92e1b68
+Create Date: 2026-10-19 04:10:00.000000
+
+Existing events become available at the time they were received, so
+anything still pending is picked up on the next run.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b8d4f1c93'
+down_revision = 'c4a7f92e1b68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'available_at' in {column['name'] for column in inspector.get_columns('webhook_events')}:
+        return  # Created by db.create_all()
+
+    op.add_column('webhook_events', sa.Column('available_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE webhook_events SET available_at = received_at')
+    with op.batch_alter_table('webhook_events') as batch_op:
+        batch_op.alter_column('available_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_webhook_events_available_at', 'webhook_events', ['available_at'])
+
+
+def downgrade():
+    op.drop_index('ix_webhook_events_available_at', table_name='webhook_events')
+    op.drop_column('webhook_events', 'available_at')
@@ -0,0 +1,75 @@
+"""Archive tables for completed orders and their invitation logs
+
+Revision ID: 8b5d0e6f3a27
+Revises: e71c4b2a9d15
+Create Date: 2026-10-19 02:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8b5d0e6f3a27'
+down_revision = 'e71c4b2a9d15'
+branch_labels = None
+depends_on = None
+
+PAYMENT_STATUSES = ('pending', 'paid', 'expired', 'failed')
+INVITATION_STATUSES = ('pending', 'processing', 'sent', 'failed', 'manual_review_required')
+
+
+def _status_type(values, name):
+    # The PostgreSQL types already exist, created with the orders columns
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql')
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'orders_archive' not in tables:
+        op.create_table(
+            'orders_archive',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('order_id', sa.String(length=50), nullable=False),
+            sa.Column('customer_email', sa.String(length=255), nullable=False),
+            sa.Column('full_name', sa.String(length=255), nullable=True),
+            sa.Column('phone_number', sa.String(length=20), nullable=True),
+            sa.Column('package_id', sa.String(length=50), nullable=False),
+            sa.Column('amount', sa.Integer(), nullable=False),
+            sa.Column('payment_status', _status_type(PAYMENT_STATUSES, 'order_payment_status'), nullable=False),
+            sa.Column('invitation_status', _status_type(INVITATION_STATUSES, 'order_invitation_status'), nullable=False),
+            sa.Column('checkout_url', sa.String(length=512), nullable=True),
+            sa.Column('payment_method', sa.String(length=64), nullable=True),
+            sa.Column('reference', sa.String(length=128), nullable=True),
+            sa.Column('expired_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_orders_archive_order_id', 'orders_archive', ['order_id'], unique=True)
+        op.create_index('ix_orders_archive_customer_email', 'orders_archive', ['customer_email'])
+        op.create_index('ix_orders_archive_reference', 'orders_archive', ['reference'])
+        op.create_index('ix_orders_archive_created_at', 'orders_archive', ['created_at'])
+
+    if 'invitation_logs_archive' not in tables:
+        op.create_table(
+            'invitation_logs_archive',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=False),
+            sa.Column('attempt_timestamp', sa.DateTime(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('screenshot_path', sa.String(length=255), nullable=True),
+            sa.Column('retry_count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_invitation_logs_archive_order_id', 'invitation_logs_archive', ['order_id'])
+
+
+def downgrade():
+    op.drop_table('invitation_logs_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,222 @@
+"""Native enum order statuses and integer amounts
+
+Revision ID: e71c4b2a9d15
+Revises: 3f2a9c1d7b40
+Create Date: 2026-10-19 01:20:00.000000
+
+Online expand/backfill/swap, so orders stays writable throughout:
+
+1. Add nullable shadow columns with the compact types (metadata-only).
+2. Keep them in sync with a BEFORE INSERT/UPDATE trigger.
+3. Backfill existing rows in id batches, one short transaction each.
+4. Build the status indexes on the shadow columns (CONCURRENTLY on PostgreSQL).
+5. Swap: drop the trigger and rename the shadow columns and their indexes
+   into place. PostgreSQL does this in one short transaction that also
+   drops the old columns. MySQL holds a brief write lock for the
+   metadata-only renames, then drops the old columns online.
+
+Application code works with either schema, so it can be deployed before or
+after this runs: the JSON listing and export turn the Decimal that the old
+NUMERIC amount returns into an integer. On MySQL with binary logging, creating the triggers needs
+SUPER or log_bin_trust_function_creators. SQLite (development) stores
+these values unchanged, so it is skipped. Databases created by
+db.create_all() after this change already have the compact columns.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e71c4b2a9d15'
+down_revision = '3f2a9c1d7b40'
+branch_labels = None
+depends_on = None
+
+PAYMENT_STATUSES = ('pending', 'paid', 'expired', 'failed')
+INVITATION_STATUSES = ('pending', 'processing', 'sent', 'failed', 'manual_review_required')
+
+BATCH_SIZE = 10000
+
+# Indexes covering a status column: name -> (columns, PostgreSQL partial predicate)
+STATUS_INDEXES = {
+    'ix_orders_payment_status': (['payment_status'], None),
+    'ix_orders_invitation_status': (['invitation_status'], None),
+    'ix_orders_payment_status_created_at': (['payment_status', 'created_at'], None),
+    'ix_orders_invitation_status_created_at': (['invitation_status', 'created_at'], None),
+    'ix_orders_invitation_payment_updated': (['invitation_status', 'payment_status', 'updated_at'], None),
+    'ix_orders_pending_created_at': (['created_at'], "payment_status_new = 'pending'"),
+    'ix_orders_failed_invitations_updated_at': (
+        ['updated_at'], "invitation_status_new = 'failed' AND payment_status_new = 'paid'"),
+}
+
+SHADOW_COLUMNS = {'payment_status': 'payment_status_new', 'invitation_status': 'invitation_status_new'}
+
+
+def _enum_sql(values):
+    return ', '.join(f"'{value}'" for value in values)
+
+
+def _shadow_columns(columns):
+    return [SHADOW_COLUMNS.get(column, column) for column in columns]
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect not in ('postgresql', 'mysql'):
+        return
+
+    columns = {column['name']: column for column in sa.inspect(bind).get_columns('orders')}
+    if isinstance(columns['payment_status']['type'], sa.Enum):
+        return  # Created by db.create_all() with the compact types already
+
+    existing = {index['name'] for index in sa.inspect(bind).get_indexes('orders')}
+    indexes = {name: spec for name, spec in STATUS_INDEXES.items() if name in existing}
+
+    if dialect == 'postgresql':
+        _upgrade_postgresql(indexes)
+    else:
+        _upgrade_mysql(indexes)
+
+
+def _backfill(set_clause):
+    """Copy existing rows into the shadow columns in id ranges, each its own transaction"""
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text('SELECT MIN(id), MAX(id) FROM orders')).one()
+    if low is None:
+        return
+    for start in range(low, high + 1, BATCH_SIZE):
+        bind.execute(sa.text(f'UPDATE orders SET {set_clause} WHERE id >= :start AND id < :end'),
+                     {'start': start, 'end': start + BATCH_SIZE})
+
+
+def _upgrade_postgresql(indexes):
+    op.execute(f"CREATE TYPE order_payment_status AS ENUM ({_enum_sql(PAYMENT_STATUSES)})")
+    op.execute(f"CREATE TYPE order_invitation_status AS ENUM ({_enum_sql(INVITATION_STATUSES)})")
+    op.execute("""
+        ALTER TABLE orders
+            ADD COLUMN payment_status_new order_payment_status,
+            ADD COLUMN invitation_status_new order_invitation_status,
+            ADD COLUMN amount_new INTEGER
+    """)
+    op.execute("""
+        CREATE FUNCTION orders_sync_compact_columns() RETURNS trigger AS $$
+        BEGIN
+            NEW.payment_status_new := NEW.payment_status::order_payment_status;
+            NEW.invitation_status_new := NEW.invitation_status::order_invitation_status;
+            NEW.amount_new := ROUND(NEW.amount)::integer;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_sync_compact_columns BEFORE INSERT OR UPDATE ON orders
+        FOR EACH ROW EXECUTE PROCEDURE orders_sync_compact_columns()
+    """)
+
+    with op.get_context().autocommit_block():
+        _backfill(
+            "payment_status_new = payment_status::order_payment_status, "
+            "invitation_status_new = invitation_status::order_invitation_status, "
+            "amount_new = ROUND(amount)::integer"
+        )
+
+        for name, (columns, where) in indexes.items():
+            op.create_index(f'{name}_new', 'orders', _shadow_columns(columns),
+                            postgresql_where=sa.text(where) if where else None,
+                            postgresql_concurrently=True)
+
+        # A validated CHECK lets SET NOT NULL skip its full-table scan during the swap
+        for column in ('payment_status_new', 'invitation_status_new', 'amount_new'):
+            op.execute(f'ALTER TABLE orders ADD CONSTRAINT {column}_not_null CHECK ({column} IS NOT NULL) NOT VALID')
+            op.execute(f'ALTER TABLE orders VALIDATE CONSTRAINT {column}_not_null')
+
+    op.execute('DROP TRIGGER orders_sync_compact_columns ON orders')
+    op.execute('DROP FUNCTION orders_sync_compact_columns()')
+    for name in indexes:
+        op.execute(f'DROP INDEX {name}')
+    op.execute('ALTER TABLE orders DROP COLUMN payment_status, DROP COLUMN invitation_status, DROP COLUMN amount')
+    for column in ('payment_status', 'invitation_status', 'amount'):
+        op.execute(f'ALTER TABLE orders RENAME COLUMN {column}_new TO {column}')
+        op.execute(f'ALTER TABLE orders ALTER COLUMN {column} SET NOT NULL')
+        op.execute(f'ALTER TABLE orders DROP CONSTRAINT {column}_new_not_null')
+    for name in indexes:
+        op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def _upgrade_mysql(indexes):
+    # The old columns become nullable so inserts keep working once they are renamed away
+    op.execute(f"""
+        ALTER TABLE orders
+            ADD COLUMN payment_status_new ENUM({_enum_sql(PAYMENT_STATUSES)}) NULL,
+            ADD COLUMN invitation_status_new ENUM({_enum_sql(INVITATION_STATUSES)}) NULL,
+            ADD COLUMN amount_new INT NULL,
+            MODIFY payment_status VARCHAR(50) NULL,
+            MODIFY invitation_status VARCHAR(50) NULL,
+            MODIFY amount NUMERIC(10, 2) NULL,
+            ALGORITHM=INPLACE, LOCK=NONE
+    """)
+    for event in ('INSERT', 'UPDATE'):
+        op.execute(f"""
+            CREATE TRIGGER orders_sync_compact_{event.lower()} BEFORE {event} ON orders
+            FOR EACH ROW SET
+                NEW.payment_status_new = NEW.payment_status,
+                NEW.invitation_status_new = NEW.invitation_status,
+                NEW.amount_new = ROUND(NEW.amount)
+        """)
+
+    with op.get_context().autocommit_block():
+        _backfill(
+            "payment_status_new = payment_status, "
+            "invitation_status_new = invitation_status, "
+            "amount_new = ROUND(amount)"
+        )
+        # InnoDB builds secondary indexes online (ALGORITHM=INPLACE, LOCK=NONE)
+        for name, (columns, _) in indexes.items():
+            op.create_index(f'{name}_new', 'orders', _shadow_columns(columns))
+
+    # MySQL DDL is not transactional: block writes only for the metadata-only renames
+    swap = []
+    for column in ('payment_status', 'invitation_status', 'amount'):
+        swap += [f'RENAME COLUMN {column} TO {column}_old', f'RENAME COLUMN {column}_new TO {column}']
+    for name in indexes:
+        swap += [f'RENAME INDEX {name} TO {name}_old', f'RENAME INDEX {name}_new TO {name}']
+    op.execute('LOCK TABLES orders WRITE')
+    op.execute('DROP TRIGGER orders_sync_compact_insert')
+    op.execute('DROP TRIGGER orders_sync_compact_update')
+    op.execute('ALTER TABLE orders ' + ', '.join(swap))
+    op.execute('UNLOCK TABLES')
+
+    # The application now writes the new columns, so this rebuild can run alongside it
+    cleanup = [f'DROP INDEX {name}_old' for name in indexes] + [
+        'DROP COLUMN payment_status_old',
+        'DROP COLUMN invitation_status_old',
+        'DROP COLUMN amount_old',
+        f"MODIFY payment_status ENUM({_enum_sql(PAYMENT_STATUSES)}) NOT NULL",
+        f"MODIFY invitation_status ENUM({_enum_sql(INVITATION_STATUSES)}) NOT NULL",
+        'MODIFY amount INT NOT NULL',
+    ]
+    op.execute('ALTER TABLE orders ' + ', '.join(cleanup) + ', ALGORITHM=INPLACE, LOCK=NONE')
+
+
+def downgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        # Not online: rewrites the table under an exclusive lock
+        op.execute("""
+            ALTER TABLE orders
+                ALTER COLUMN payment_status TYPE VARCHAR(50) USING payment_status::text,
+                ALTER COLUMN invitation_status TYPE VARCHAR(50) USING invitation_status::text,
+                ALTER COLUMN amount TYPE NUMERIC(10, 2)
+        """)
+        op.execute('DROP TYPE IF EXISTS order_payment_status')
+        op.execute('DROP TYPE IF EXISTS order_invitation_status')
+    elif dialect == 'mysql':
+        op.execute("""
+            ALTER TABLE orders
+                MODIFY payment_status VARCHAR(50) NOT NULL,
+                MODIFY invitation_status VARCHAR(50) NOT NULL,
+                MODIFY amount NUMERIC(10, 2) NOT NULL
+        """)
@@ -2,10 +2,27 @@ from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import func
 
-db = SQLAlchemy()
+from utils.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Stored as native enums (1 byte on MySQL, 4 on PostgreSQL) instead of VARCHAR(50).
+# Append new values at the end; adding one needs a migration (ALTER TYPE / MODIFY).
+PAYMENT_STATUSES = ('pending', 'paid', 'expired', 'failed')
+INVITATION_STATUSES = ('pending', 'processing', 'sent', 'failed', 'manual_review_required')
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Window scans over pending orders (reconciliation, expiry)
+        db.Index('ix_orders_payment_status_created_at', 'payment_status', 'created_at'),
+        # Admin listing: keyset pagination on (created_at, id), alone or after an equality filter
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_invitation_status_created_at', 'invitation_status', 'created_at'),
+        db.Index('ix_orders_package_id_created_at', 'package_id', 'created_at'),
+        # Failed invitation retries. PostgreSQL also gets smaller partial indexes from migrations/versions
+        db.Index('ix_orders_invitation_payment_updated', 'invitation_status', 'payment_status', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.String(50), unique=True, nullable=False, index=True)
@@ -13,12 +30,17 @@ class Order(db.Model):
     full_name = db.Column(db.String(255), nullable=True)
     phone_number = db.Column(db.String(20), nullable=True)
     package_id = db.Column(db.String(50), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
-    payment_status = db.Column(db.String(50), nullable=False, default='pending', index=True)
-    invitation_status = db.Column(db.String(50), nullable=False, default='pending', index=True)
+    amount = db.Column(db.Integer, nullable=False)  # Whole rupiah
+    payment_status = db.Column(db.Enum(*PAYMENT_STATUSES, name='order_payment_status'),
+                               nullable=False, default='pending', index=True)
+    invitation_status = db.Column(db.Enum(*INVITATION_STATUSES, name='order_invitation_status'),
+                                  nullable=False, default='pending', index=True)
     checkout_url = db.Column(db.String(512), nullable=True)
     payment_method = db.Column(db.String(64), nullable=True)
     reference = db.Column(db.String(128), nullable=True, index=True)
+    qr_string = db.Column(db.Text, nullable=True)
+    expired_at = db.Column(db.DateTime, nullable=True)
+    invitation_locked_until = db.Column(db.DateTime, nullable=True)  # Lease held by the running invitation task
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -36,12 +58,13 @@ class Order(db.Model):
             'full_name': self.full_name,
             'phone_number': self.phone_number,
             'package_id': self.package_id,
-            'amount': float(self.amount),
+            'amount': self.amount,
             'payment_status': self.payment_status,
             'invitation_status': self.invitation_status,
             'checkout_url': self.checkout_url,
             'payment_method': self.payment_method,
             'reference': self.reference,
+            'expired_at': self.expired_at.isoformat() if self.expired_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -119,3 +142,163 @@ class AdminAccount(db.Model):
             'failed_attempts': self.failed_attempts,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.event_type}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'payload': self.payload,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class WebhookEvent(db.Model):
+    __tablename__ = 'webhook_events'
+    __table_args__ = (
+        db.UniqueConstraint('reference', 'status', name='uq_webhook_events_reference_status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    reference = db.Column(db.String(128), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    merchant_ref = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # Retry backoff
+    processed_at = db.Column(db.DateTime, nullable=True, index=True)
+    
+    def __repr__(self):
+        return f'<WebhookEvent {self.reference} {self.status}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'reference': self.reference,
+            'status': self.status,
+            'merchant_ref': self.merchant_ref,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
+
+class ArchivedOrder(db.Model):
+    """Completed order moved out of the hot orders table by the archival job"""
+    __tablename__ = 'orders_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id as in orders
+    order_id = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    customer_email = db.Column(db.String(255), nullable=False, index=True)
+    full_name = db.Column(db.String(255), nullable=True)
+    phone_number = db.Column(db.String(20), nullable=True)
+    package_id = db.Column(db.String(50), nullable=False)
+    amount = db.Column(db.Integer, nullable=False)
+    payment_status = db.Column(db.Enum(*PAYMENT_STATUSES, name='order_payment_status'), nullable=False)
+    invitation_status = db.Column(db.Enum(*INVITATION_STATUSES, name='order_invitation_status'), nullable=False)
+    checkout_url = db.Column(db.String(512), nullable=True)
+    payment_method = db.Column(db.String(64), nullable=True)
+    reference = db.Column(db.String(128), nullable=True, index=True)
+    expired_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    invitation_logs = db.relationship(
+        'ArchivedInvitationLog', lazy=True,
+        primaryjoin='ArchivedOrder.id == foreign(ArchivedInvitationLog.order_id)'
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedOrder {self.order_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'customer_email': self.customer_email,
+            'full_name': self.full_name,
+            'phone_number': self.phone_number,
+            'package_id': self.package_id,
+            'amount': self.amount,
+            'payment_status': self.payment_status,
+            'invitation_status': self.invitation_status,
+            'checkout_url': self.checkout_url,
+            'payment_method': self.payment_method,
+            'reference': self.reference,
+            'expired_at': self.expired_at.isoformat() if self.expired_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+class ArchivedInvitationLog(db.Model):
+    """Invitation log of an archived order"""
+    __tablename__ = 'invitation_logs_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id as in invitation_logs
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    attempt_timestamp = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    error_message = db.Column(db.Text, nullable=True)
+    screenshot_path = db.Column(db.String(255), nullable=True)
+    retry_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ArchivedInvitationLog {self.id} - Order {self.order_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'attempt_timestamp': self.attempt_timestamp.isoformat() if self.attempt_timestamp else None,
+            'status': self.status,
+            'error_message': self.error_message,
+            'screenshot_path': self.screenshot_path,
+            'retry_count': self.retry_count
+        }
+
+class OrderDailyRollup(db.Model):
+    """
+    Order and invitation counters per creation day, package and payment method
+
+    Updated in the same transaction as every status transition, so stats
+    read O(days) rows instead of scanning orders. Counters only go up: an
+    order that expires and is paid late counts in both orders_expired and
+    orders_paid, and invitation_failures counts failed attempts.
+    """
+    __tablename__ = 'order_daily_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)  # UTC day the orders were created
+    package_id = db.Column(db.String(50), primary_key=True)
+    payment_method = db.Column(db.String(64), primary_key=True)  # '' when unknown
+    orders_created = db.Column(db.Integer, nullable=False, default=0)
+    orders_paid = db.Column(db.Integer, nullable=False, default=0)
+    orders_expired = db.Column(db.Integer, nullable=False, default=0)
+    orders_failed = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.BigInteger, nullable=False, default=0)  # Sum of paid order amounts
+    invitations_sent = db.Column(db.Integer, nullable=False, default=0)
+    invitation_failures = db.Column(db.Integer, nullable=False, default=0)
+    invitations_manual_review = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<OrderDailyRollup {self.day} {self.package_id} {self.payment_method}>'
@@ -1,17 +1,36 @@
 import os
 import logging
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from celery import Celery
-from celery import shared_task
+from celery import shared_task, group
+from celery.exceptions import Retry
 from flask import current_app
-from models import db, Order, InvitationLog
+from sqlalchemy import func
+from models import db, Order, InvitationLog, OutboxEvent, WebhookEvent
 from automation.chatgpt_inviter import create_inviter
-from utils.email_service import send_invitation_confirmation, send_admin_notification
+from utils.email_service import send_invitation_confirmation, send_admin_notification, send_payment_confirmation
+from utils.cache import redis_lock
+from utils.order_events import publish_order_status
+from utils.order_status import invalidate_order_status
+from utils.order_state import claim_invitation, finish_invitation, expire_pending_orders, expire_orders
+from utils.order_rollups import record_invitation_failure
+from utils.order_expiry import claim_due_expiries, reschedule_expiries
+from utils.order_archive import archive_completed_orders
+from utils.webhook_events import apply_webhook_event
+from utils.reconciliation import reconcile_pending_payments
+from utils.outbox import (
+    add_outbox_event, INVITATION_REQUESTED, PAYMENT_CONFIRMATION_EMAIL,
+    INVITATION_CONFIRMATION_EMAIL, MANUAL_REVIEW_NOTIFICATION
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXPIRY_SWEEP_LOCK_KEY = 'locks:cleanup_expired_orders'
+ARCHIVE_LOCK_KEY = 'locks:archive_old_orders'
+
 def make_celery(app):
     """Create Celery instance and configure it with Flask app"""
     celery = Celery(
@@ -29,6 +48,7 @@ def make_celery(app):
                 return self.run(*args, **kwargs)
     
     celery.Task = ContextTask
+    setup_periodic_tasks(celery)
     return celery
 
 # This will be initialized in app.py
@@ -45,6 +65,7 @@ def process_invitation_task(self, order_id):
     Returns:
         dict: Result of the invitation process
     """
+    claimed = None
     try:
         logger.info(f"Starting invitation process for order {order_id}")
         
@@ -54,14 +75,12 @@ def process_invitation_task(self, order_id):
             logger.error(f"Order {order_id} not found")
             return {'success': False, 'error': 'Order not found'}
         
-        # Check if order is paid
-        if order.payment_status != 'paid':
-            logger.error(f"Order {order_id} is not paid. Status: {order.payment_status}")
-            return {'success': False, 'error': 'Order is not paid'}
-        
-        # Update invitation status to processing
-        order.invitation_status = 'processing'
-        db.session.commit()
+        # Claim the order; duplicate or concurrent tasks for the same order stop here
+        claimed = claim_invitation(order.id, current_app.config.get('INVITATION_LEASE_SECONDS', 900))
+        if not claimed:
+            db.session.rollback()
+            logger.warning(f"Order {order_id} not claimable (status {order.payment_status}/{order.invitation_status}), skipping")
+            return {'success': False, 'error': 'Order is not paid or invitation already handled'}
         
         # Create invitation log entry
         log_entry = InvitationLog(
@@ -71,6 +90,7 @@ def process_invitation_task(self, order_id):
         )
         db.session.add(log_entry)
         db.session.commit()
+        publish_order_status(claimed)
         
         # Get configuration
         team_url = current_app.config.get('CHATGPT_ADMIN_URL', 'https://chatgpt.com/admin?tab=members')
@@ -86,20 +106,19 @@ def process_invitation_task(self, order_id):
         
         if success:
             # Update order status
-            order.invitation_status = 'sent'
-            order.updated_at = datetime.utcnow()
+            finished = finish_invitation(order.id, 'sent')
             
             # Update log
             log_entry.status = 'success'
             
-            db.session.commit()
+            # Confirmation email to customer goes out through the outbox
+            if finished:
+                add_outbox_event(INVITATION_CONFIRMATION_EMAIL, order_id=order.id)
             
-            # Send confirmation email to customer
-            try:
-                send_invitation_confirmation(order)
-                logger.info(f"Confirmation email sent to {order.customer_email}")
-            except Exception as e:
-                logger.error(f"Failed to send confirmation email: {str(e)}")
+            db.session.commit()
+            if finished:
+                publish_order_status(finished)
+                kick_outbox_relay()
             
             logger.info(f"Invitation process completed successfully for order {order_id}")
             return {
@@ -116,6 +135,7 @@ def process_invitation_task(self, order_id):
             # Update log
             log_entry.status = 'failure'
             log_entry.error_message = error_msg
+            record_invitation_failure(order)
             
             # Check retry count
             if self.request.retries < self.max_retries:
@@ -123,22 +143,19 @@ def process_invitation_task(self, order_id):
                 retry_delay = 300 * (2 ** self.request.retries)  # 5min, 10min, 20min
                 logger.info(f"Scheduling retry {self.request.retries + 1} for order {order_id} in {retry_delay} seconds")
                 
+                # Release the claim so the retry can take it
+                finish_invitation(order.id, 'processing', claim=claimed)
                 db.session.commit()
                 raise self.retry(countdown=retry_delay)
             else:
                 # Max retries reached, mark as failed
-                order.invitation_status = 'manual_review_required'
+                finished = finish_invitation(order.id, 'manual_review_required')
+                if finished:
+                    add_outbox_event(MANUAL_REVIEW_NOTIFICATION, order_id=order.id, max_retries=self.max_retries)
                 db.session.commit()
-                
-                # Send admin notification
-                try:
-                    send_admin_notification(
-                        subject=f"Manual Review Required - Order {order.order_id}",
-                        message=f"Invitation failed for order {order.order_id} after {self.max_retries} retries. Customer email: {order.customer_email}",
-                        order=order
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send admin notification: {str(e)}")
+                if finished:
+                    publish_order_status(finished)
+                    kick_outbox_relay()
                 
                 return {
                     'success': False,
@@ -146,23 +163,29 @@ def process_invitation_task(self, order_id):
                     'order_id': order.order_id
                 }
     
+    except Retry:
+        raise
+    
     except Exception as e:
         logger.error(f"Unexpected error in invitation process for order {order_id}: {str(e)}")
         
         try:
-            # Update order and log
-            order = Order.query.get(order_id)
-            if order:
-                order.invitation_status = 'failed'
-                
+            db.session.rollback()
+            
+            # Update order and log, only if this run still holds the claim:
+            # otherwise another run owns the order, or it was never ours
+            finished = finish_invitation(order_id, 'failed', claim=claimed) if claimed else None
+            if finished:
                 log_entry = InvitationLog(
-                    order_id=order.id,
+                    order_id=order_id,
                     status='failure',
                     error_message=str(e),
                     retry_count=self.request.retries
                 )
                 db.session.add(log_entry)
+                record_invitation_failure(finished)
                 db.session.commit()
+                publish_order_status(finished)
         except Exception as db_error:
             logger.error(f"Failed to update database after error: {str(db_error)}")
         
@@ -173,61 +196,338 @@ def process_invitation_task(self, order_id):
         
         return {'success': False, 'error': str(e)}
 
+def _dispatch_outbox_event(event, producer):
+    """Perform one outbox side effect. Raises to have the event retried later."""
+    order = Order.query.get(event.payload['order_id'])
+    if not order:
+        logger.error(f"Outbox event {event.id}: order {event.payload['order_id']} not found, dropping")
+        return
+    
+    if event.event_type == INVITATION_REQUESTED:
+        if not current_app.config.get('ENABLE_CELERY', False):
+            logger.info(f"Celery disabled, invitation task not queued for order {order.order_id}")
+            return
+        process_invitation_task.apply_async(args=[order.id], producer=producer)
+        logger.info(f"Invitation task queued for order {order.order_id}")
+    elif event.event_type == PAYMENT_CONFIRMATION_EMAIL:
+        if not send_payment_confirmation(order):
+            raise RuntimeError('Payment confirmation email not sent')
+    elif event.event_type == INVITATION_CONFIRMATION_EMAIL:
+        if not send_invitation_confirmation(order):
+            raise RuntimeError('Invitation confirmation email not sent')
+        logger.info(f"Confirmation email sent to {order.customer_email}")
+    elif event.event_type == MANUAL_REVIEW_NOTIFICATION:
+        send_admin_notification(
+            subject=f"Manual Review Required - Order {order.order_id}",
+            message=f"Invitation failed for order {order.order_id} after {event.payload.get('max_retries')} retries. Customer email: {order.customer_email}",
+            order=order
+        )
+    else:
+        logger.error(f"Outbox event {event.id}: unknown type {event.event_type}, dropping")
+
+def drain_outbox(batch_size=None, max_batches=None):
+    """
+    Dispatch pending outbox events in batches
+    
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several relays
+    can run at once. The claim pushes available_at out by OUTBOX_CLAIM_SECONDS
+    and commits before anything is sent, so no row lock is held during slow
+    sends; events of a relay that dies are picked up again once the claim
+    runs out. Dispatched events are deleted; failed ones are retried with
+    capped exponential backoff up to OUTBOX_MAX_ATTEMPTS, then left in the
+    table with their last error as dead letters.
+    
+    Returns:
+        int: Number of events dispatched
+    """
+    batch_size = batch_size or current_app.config.get('OUTBOX_BATCH_SIZE', 100)
+    max_batches = max_batches or current_app.config.get('OUTBOX_MAX_BATCHES', 10)
+    max_attempts = current_app.config.get('OUTBOX_MAX_ATTEMPTS', 10)
+    claim_seconds = current_app.config.get('OUTBOX_CLAIM_SECONDS', 600)
+    celery_enabled = current_app.config.get('ENABLE_CELERY', False)
+    dispatched = 0
+    
+    for _ in range(max_batches):
+        now = datetime.utcnow()
+        events = OutboxEvent.query.filter(
+            OutboxEvent.available_at <= now,
+            OutboxEvent.attempts < max_attempts
+        ).order_by(OutboxEvent.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        if not events:
+            break
+        
+        for event in events:
+            event.available_at = now + timedelta(seconds=claim_seconds)
+        db.session.commit()
+        
+        # One broker connection for the whole batch
+        producer_context = process_invitation_task.app.producer_or_acquire() if celery_enabled else nullcontext()
+        with producer_context as producer:
+            for event in events:
+                try:
+                    _dispatch_outbox_event(event, producer)
+                    db.session.delete(event)
+                    dispatched += 1
+                except Exception as e:
+                    db.session.rollback()
+                    event.attempts += 1
+                    event.last_error = str(e)
+                    if event.attempts >= max_attempts:
+                        logger.error(f"Outbox event {event.id} ({event.event_type}) failed {event.attempts} times, giving up: {str(e)}")
+                    else:
+                        event.available_at = datetime.utcnow() + timedelta(seconds=min(30 * (2 ** event.attempts), 3600))
+                        logger.error(f"Outbox event {event.id} ({event.event_type}) failed, attempt {event.attempts}: {str(e)}")
+                # Commit per event so a relay that dies mid-batch does not resend what it already sent
+                db.session.commit()
+        
+        if len(events) < batch_size:
+            break
+    
+    if dispatched:
+        logger.info(f"Outbox relay dispatched {dispatched} events")
+    return dispatched
+
+def kick_outbox_relay():
+    """Ask a worker to drain the outbox now; the periodic relay covers any failure here"""
+    try:
+        relay_outbox.delay()
+    except Exception as e:
+        logger.warning(f"Failed to queue outbox relay, periodic relay will pick it up: {str(e)}")
+
 @shared_task
-def cleanup_expired_orders():
-    """Clean up expired orders and update their status"""
+def relay_outbox():
+    """Drain the outbox; queued after commits and run periodically as a safety net"""
     try:
-        logger.info("Starting cleanup of expired orders")
-        
-        # Find orders that are pending payment for more than 24 hours
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        expired_orders = Order.query.filter(
-            Order.payment_status == 'pending',
-            Order.created_at < cutoff_time
-        ).all()
+        return {'success': True, 'dispatched': drain_outbox()}
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error during outbox relay: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+def drain_webhook_events(batch_size=None, max_batches=None):
+    """
+    Apply journaled Tripay callbacks in batches
+    
+    Each event runs in its own savepoint so one bad event does not hold
+    back the batch. A failed event is pushed back with capped exponential
+    backoff, so later batches and runs skip it until then, and it is retried
+    up to WEBHOOK_EVENT_MAX_ATTEMPTS times.
+    
+    Returns:
+        tuple: (events processed, orders whose status changed)
+    """
+    batch_size = batch_size or current_app.config.get('WEBHOOK_EVENT_BATCH_SIZE', 100)
+    max_batches = max_batches or current_app.config.get('WEBHOOK_EVENT_MAX_BATCHES', 10)
+    max_attempts = current_app.config.get('WEBHOOK_EVENT_MAX_ATTEMPTS', 5)
+    processed = 0
+    changed = []
+    
+    for _ in range(max_batches):
+        events = WebhookEvent.query.filter(
+            WebhookEvent.processed_at.is_(None),
+            WebhookEvent.attempts < max_attempts,
+            WebhookEvent.available_at <= datetime.utcnow()
+        ).order_by(WebhookEvent.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        if not events:
+            break
         
-        for order in expired_orders:
-            order.payment_status = 'expired'
-            order.updated_at = datetime.utcnow()
-            
-            logger.info(f"Marked order {order.order_id} as expired")
+        batch_changed = []
+        for event in events:
+            try:
+                with db.session.begin_nested():
+                    order = apply_webhook_event(event)
+                event.processed_at = datetime.utcnow()
+                processed += 1
+                if order:
+                    batch_changed.append(order)
+            except Exception as e:
+                event.attempts += 1
+                event.last_error = str(e)
+                event.available_at = datetime.utcnow() + timedelta(seconds=min(30 * (2 ** event.attempts), 3600))
+                logger.error(f"Webhook event {event.id} ({event.reference}/{event.status}) failed, attempt {event.attempts}: {str(e)}")
         
         db.session.commit()
-        logger.info(f"Cleanup completed. {len(expired_orders)} orders marked as expired")
-        
-        return {'success': True, 'expired_count': len(expired_orders)}
+        for order in batch_changed:
+            publish_order_status(order)
+        changed.extend(batch_changed)
         
+        if len(events) < batch_size:
+            break
+    
+    return processed, changed
+
+@shared_task
+def process_webhook_events():
+    """Apply journaled Tripay callbacks; queued by the webhook and run periodically"""
+    try:
+        processed, changed = drain_webhook_events()
+        if any(order.payment_status == 'paid' for order in changed):
+            kick_outbox_relay()
+        if processed:
+            logger.info(f"Processed {processed} webhook events, {len(changed)} orders updated")
+        return {'success': True, 'processed': processed, 'updated': len(changed)}
     except Exception as e:
-        logger.error(f"Error during cleanup: {str(e)}")
+        db.session.rollback()
+        logger.error(f"Error processing webhook events: {str(e)}")
         return {'success': False, 'error': str(e)}
 
+def kick_webhook_processing():
+    """Ask a worker to process journaled callbacks now; the periodic run covers any failure here"""
+    try:
+        process_webhook_events.delay()
+    except Exception as e:
+        logger.warning(f"Failed to queue webhook processing, periodic run will pick it up: {str(e)}")
+
+@shared_task
+def reconcile_payments():
+    """Poll Tripay for pending and recently expired orders whose callback may have been lost"""
+    try:
+        result = reconcile_pending_payments()
+        if result['recorded']:
+            logger.info(f"Reconciliation recorded {result['recorded']} missed callbacks out of {result['checked']} checked")
+            kick_webhook_processing()
+        return {'success': True, **result}
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error during payment reconciliation: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+@shared_task
+def expire_due_orders():
+    """Expire orders whose Tripay payment deadline has passed, driven by the expiry schedule"""
+    batch_size = current_app.config.get('EXPIRY_TICK_BATCH_SIZE', 200)
+    expired_count = 0
+    
+    while True:
+        order_ids = claim_due_expiries(batch_size)
+        if not order_ids:
+            break
+        
+        try:
+            expired_orders = expire_orders(order_ids)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            reschedule_expiries(order_ids)
+            logger.error(f"Error expiring due orders: {str(e)}")
+            return {'success': False, 'error': str(e)}
+        
+        for order in expired_orders:
+            publish_order_status(order)
+        expired_count += len(expired_orders)
+        
+        if len(order_ids) < batch_size:
+            break
+    
+    if expired_count:
+        logger.info(f"{expired_count} orders expired at their payment deadline")
+    return {'success': True, 'expired_count': expired_count}
+
+@shared_task
+def cleanup_expired_orders():
+    """Expire orders left pending for 24 hours, in chunks, on one beat instance at a time"""
+    chunk_size = current_app.config.get('EXPIRY_SWEEP_CHUNK_SIZE', 500)
+    max_chunks = current_app.config.get('EXPIRY_SWEEP_MAX_CHUNKS', 50)
+    
+    with redis_lock(EXPIRY_SWEEP_LOCK_KEY, current_app.config.get('EXPIRY_SWEEP_LOCK_TTL', 600)) as acquired:
+        if not acquired:
+            logger.info("Expiry sweep already running elsewhere, skipping")
+            return {'success': True, 'skipped': True, 'expired_count': 0}
+        
+        try:
+            logger.info("Starting cleanup of expired orders")
+            
+            # Find orders that are pending payment for more than 24 hours
+            cutoff_time = datetime.utcnow() - timedelta(hours=24)
+            expired_count = 0
+            chunks = []
+            
+            for chunk in range(1, max_chunks + 1):
+                # Each chunk is its own short transaction so row locks are held briefly
+                expired_orders = expire_pending_orders(cutoff_time, limit=chunk_size)
+                db.session.commit()
+                if not expired_orders:
+                    break
+                
+                for order in expired_orders:
+                    publish_order_status(order)
+                expired_count += len(expired_orders)
+                chunks.append(len(expired_orders))
+                logger.info(f"Expiry chunk {chunk}: {len(expired_orders)} orders marked as expired")
+                
+                if len(expired_orders) < chunk_size:
+                    break
+            
+            logger.info(f"Cleanup completed. {expired_count} orders marked as expired in {len(chunks)} chunks")
+            
+            return {'success': True, 'expired_count': expired_count, 'chunks': chunks}
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error during cleanup: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+@shared_task
+def archive_old_orders():
+    """Move completed orders older than ORDER_ARCHIVE_AFTER_DAYS, with their logs, to the archive tables"""
+    with redis_lock(ARCHIVE_LOCK_KEY, current_app.config.get('ORDER_ARCHIVE_LOCK_TTL', 3600)) as acquired:
+        if not acquired:
+            logger.info("Order archival already running elsewhere, skipping")
+            return {'success': True, 'skipped': True, 'archived_count': 0}
+        
+        try:
+            cutoff_time = datetime.utcnow() - timedelta(days=current_app.config.get('ORDER_ARCHIVE_AFTER_DAYS', 180))
+            batches = archive_completed_orders(
+                cutoff_time,
+                batch_size=current_app.config.get('ORDER_ARCHIVE_BATCH_SIZE', 500),
+                max_batches=current_app.config.get('ORDER_ARCHIVE_MAX_BATCHES', 100)
+            )
+            logger.info(f"Archival completed. {sum(batches)} orders archived in {len(batches)} batches")
+            return {'success': True, 'archived_count': sum(batches), 'batches': batches}
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error during order archival: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
 @shared_task
 def retry_failed_invitations():
     """Retry failed invitations that might be recoverable"""
     try:
         logger.info("Starting retry of failed invitations")
         
-        # Find orders with failed invitations from the last 6 hours
+        # Find orders with failed invitations from the last 6 hours that
+        # have had fewer than 5 attempts, counted in the same query
         cutoff_time = datetime.utcnow() - timedelta(hours=6)
-        failed_orders = Order.query.filter(
+        max_attempts = current_app.config.get('INVITATION_MAX_ATTEMPTS', 5)
+        eligible = db.session.query(Order.id, Order.order_id).outerjoin(
+            InvitationLog, InvitationLog.order_id == Order.id
+        ).filter(
             Order.invitation_status == 'failed',
             Order.payment_status == 'paid',
             Order.updated_at > cutoff_time
-        ).all()
+        ).group_by(Order.id, Order.order_id).having(
+            func.count(InvitationLog.id) < max_attempts
+        ).order_by(Order.id).all()
         
-        retry_count = 0
-        for order in failed_orders:
-            # Check if we haven't already retried too many times
-            log_count = InvitationLog.query.filter_by(order_id=order.id).count()
-            
-            if log_count < 5:  # Max 5 total attempts
-                logger.info(f"Retrying invitation for order {order.order_id}")
-                process_invitation_task.delay(order.id)
-                retry_count += 1
+        if not eligible:
+            logger.info("Retry process completed. 0 invitations queued for retry")
+            return {'success': True, 'retry_count': 0}
+        
+        # The queued tasks move these orders back to processing
+        invalidate_order_status(*[order.order_id for order in eligible])
         
-        logger.info(f"Retry process completed. {retry_count} invitations queued for retry")
+        # Spread the retries over the window so a backlog does not hit the browser queue at once
+        spread = current_app.config.get('INVITATION_RETRY_SPREAD', 3600)
+        step = spread / len(eligible)
+        group(
+            process_invitation_task.signature((order.id,), countdown=int(i * step))
+            for i, order in enumerate(eligible)
+        ).apply_async()
         
-        return {'success': True, 'retry_count': retry_count}
+        logger.info(f"Retry process completed. {len(eligible)} invitations queued for retry over {spread}s")
+        
+        return {'success': True, 'retry_count': len(eligible)}
         
     except Exception as e:
         logger.error(f"Error during retry process: {str(e)}")
@@ -235,11 +535,15 @@ def retry_failed_invitations():
 
 # Periodic tasks configuration
 def setup_periodic_tasks(sender, **kwargs):
-    """Setup periodic tasks - only if Celery is enabled"""
-    if not current_app.config.get('ENABLE_CELERY', False):
-        return
-        
-    # Cleanup expired orders every hour
+    """Register the periodic tasks, run by celery beat"""
+    # Expire orders at their payment deadline
+    sender.add_periodic_task(
+        5.0,  # 5 seconds
+        expire_due_orders.s(),
+        name='expire due orders'
+    )
+    
+    # Backstop sweep for orders missing from the expiry schedule, every hour
     sender.add_periodic_task(
         3600.0,  # 1 hour
         cleanup_expired_orders.s(),
@@ -252,28 +556,31 @@ def setup_periodic_tasks(sender, **kwargs):
         retry_failed_invitations.s(),
         name='retry failed invitations'
     )
-
-# Only register if Celery is enabled
-try:
-    from flask import current_app
-    if current_app and current_app.config.get('ENABLE_CELERY', False):
-        from celery.signals import after_configure
-        after_configure.connect(setup_periodic_tasks)
-except:
-    pass
-def setup_periodic_tasks(sender, **kwargs):
-    """Setup periodic tasks"""
     
-    # Cleanup expired orders every hour
+    # Relay outbox events missed by the post-commit trigger
     sender.add_periodic_task(
-        3600.0,  # 1 hour
-        cleanup_expired_orders.s(),
-        name='cleanup expired orders'
+        15.0,  # 15 seconds
+        relay_outbox.s(),
+        name='relay outbox'
     )
     
-    # Retry failed invitations every 2 hours
+    # Process journaled webhook events missed by the post-ack trigger
     sender.add_periodic_task(
-        7200.0,  # 2 hours
-        retry_failed_invitations.s(),
-        name='retry failed invitations'
+        15.0,  # 15 seconds
+        process_webhook_events.s(),
+        name='process webhook events'
+    )
+    
+    # Reconcile pending and recently expired orders against Tripay in case a callback was lost
+    sender.add_periodic_task(
+        300.0,  # 5 minutes
+        reconcile_payments.s(),
+        name='reconcile payments'
+    )
+    
+    # Archive completed orders once a day
+    sender.add_periodic_task(
+        86400.0,  # 24 hours
+        archive_old_orders.s(),
+        name='archive old orders'
     )
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Required settings, before config is imported
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+os.environ.setdefault('TRIPAY_API_KEY', 'test')
+os.environ.setdefault('TRIPAY_MERCHANT_CODE', 'test')
+os.environ.setdefault('TRIPAY_PRIVATE_KEY', 'test')
+os.environ.setdefault('TRIPAY_CALLBACK_URL', 'http://localhost/api/payment/webhook')
+os.environ.setdefault('RATE_LIMIT_STORAGE_URL', 'memory://')
+
+from app import create_app
+from models import db as _db
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """In-memory Redis behind utils.cache.get_redis(), from requirements-dev.txt"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import utils.cache
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(utils.cache, '_client', client)
+    return client
@@ -0,0 +1,34 @@
+import pytest
+
+from models import Order
+
+
+@pytest.fixture
+def orders(db):
+    for i in range(3):
+        db.session.add(Order(order_id=f'ORD-TEST-{i}', customer_email=f'buyer{i}@example.com',
+                             package_id='chatgpt_plus_1_month', amount=25000, payment_method='QRIS'))
+    db.session.commit()
+
+
+def test_export_is_disabled_without_a_configured_token(app, client, orders):
+    app.config['ADMIN_API_TOKEN'] = None
+    assert client.get('/api/admin/orders/export').status_code == 403
+
+
+@pytest.mark.parametrize('authorization', [None, 'Bearer wrong', 'secret', 'Basic secret'])
+def test_export_rejects_a_missing_or_wrong_token(app, client, orders, authorization):
+    app.config['ADMIN_API_TOKEN'] = 'secret'
+    headers = {'Authorization': authorization} if authorization else {}
+    response = client.get('/api/admin/orders/export', headers=headers)
+    assert response.status_code == 401
+    assert b'buyer' not in response.data
+
+
+def test_export_streams_orders_with_the_token(app, client, orders):
+    app.config['ADMIN_API_TOKEN'] = 'secret'
+    response = client.get('/api/admin/orders/export', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 4  # Header and three orders
+    assert 'buyer2@example.com' in lines[-1]
@@ -0,0 +1,16 @@
+def test_health_is_a_cheap_public_liveness_check(client):
+    body = client.get('/health').get_json()
+    assert body['status'] == 'healthy'
+    assert 'database_replica' not in body
+    assert 'webhook_filter' not in body
+    assert 'database_pool' not in body
+
+
+def test_metrics_require_the_admin_token(app, client):
+    app.config['ADMIN_API_TOKEN'] = 'secret'
+    assert client.get('/api/admin/metrics').status_code == 401
+
+    body = client.get('/api/admin/metrics', headers={'Authorization': 'Bearer secret'}).get_json()
+    assert body['database_replica'] == {'configured': False}
+    assert body['webhook_filter'] == {}  # No callbacks seen by this worker yet
+    assert 'default' in body['database_pool']
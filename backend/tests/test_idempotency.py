@@ -0,0 +1,88 @@
+import os
+import time
+from functools import partial
+
+import pytest
+from email_validator import validate_email
+
+import utils.package_catalog
+import utils.payment_channels
+import utils.tripay_client
+import utils.validators
+from app import init_database
+from models import Order
+from utils.idempotency import claim_idempotency_key, store_idempotent_response
+
+
+class FakeTripay:
+    def __init__(self):
+        self.transactions = 0
+
+    def create_transaction(self, payment_data, method='QRIS'):
+        self.transactions += 1
+        return {'success': True, 'reference': f'T-{self.transactions}', 'payment_method': method,
+                'checkout_url': f'https://tripay.test/checkout/{self.transactions}',
+                'expired_time': int(time.time()) + 86400}
+
+    def get_payment_channels(self, timeout=30):
+        return {'success': True, 'data': [{'code': 'QRIS', 'name': 'QRIS', 'active': True}]}
+
+
+@pytest.fixture
+def tripay(app, monkeypatch, redis_client):
+    """Everything create_order needs: packages, a fake Tripay and no network lookups"""
+    init_database(app)
+    monkeypatch.setattr(utils.package_catalog, '_catalog', None)
+    monkeypatch.setattr(utils.package_catalog, '_subscriber_pid', os.getpid())  # No listener thread
+    tripay = FakeTripay()
+    monkeypatch.setattr(utils.tripay_client, '_client', tripay)
+    monkeypatch.setattr(utils.payment_channels, '_local_entry', None)
+    monkeypatch.setattr(utils.validators, 'validate_email', partial(validate_email, check_deliverability=False))
+    return tripay
+
+
+def _order_body(email='buyer@example.com'):
+    return {'customer_email': email, 'package_id': 'chatgpt_plus_1_month', 'payment_method': 'QRIS'}
+
+
+def test_claim_states(app, redis_client):
+    assert claim_idempotency_key('key-1', 'body-a') == ('new', None)
+    assert claim_idempotency_key('key-1', 'body-a')[0] == 'in_progress'
+    assert claim_idempotency_key('key-1', 'body-b')[0] == 'mismatch'
+
+    store_idempotent_response('key-1', 'body-a', {'order_id': 'ORD-1'}, 201)
+    state, record = claim_idempotency_key('key-1', 'body-a')
+    assert state == 'replay'
+    assert (record['body'], record['status_code']) == ({'order_id': 'ORD-1'}, 201)
+
+
+def test_retry_replays_the_stored_response(client, tripay):
+    headers = {'Idempotency-Key': 'retry-me'}
+    first = client.post('/api/orders', json=_order_body(), headers=headers)
+    retry = client.post('/api/orders', json=_order_body(), headers=headers)
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json()['order_id'] == first.get_json()['order_id']
+    assert tripay.transactions == 1
+    assert Order.query.count() == 1
+
+
+def test_key_reused_with_a_different_body_is_rejected(client, tripay):
+    headers = {'Idempotency-Key': 'reused'}
+    client.post('/api/orders', json=_order_body(), headers=headers)
+    response = client.post('/api/orders', json=_order_body('someone.else@example.com'), headers=headers)
+
+    assert response.status_code == 422
+    assert tripay.transactions == 1
+
+
+def test_failed_request_releases_the_key(client, tripay):
+    headers = {'Idempotency-Key': 'invalid-first'}
+    invalid = client.post('/api/orders', json=dict(_order_body(), package_id='no-such-package'), headers=headers)
+    assert invalid.status_code == 400
+
+    # Errors are not stored, so the client can fix the body and retry with the same key
+    assert client.post('/api/orders', json=_order_body(), headers=headers).status_code == 201
+    assert tripay.transactions == 1
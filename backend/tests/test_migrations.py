@@ -0,0 +1,16 @@
+import os
+
+import sqlalchemy as sa
+from flask_migrate import upgrade
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def test_upgrade_builds_an_empty_database(db):
+    db.drop_all()
+
+    upgrade(directory=MIGRATIONS_DIR)
+
+    inspector = sa.inspect(db.engine)
+    assert {'orders', 'outbox', 'webhook_events', 'order_daily_rollups'} <= set(inspector.get_table_names())
+    assert 'invitation_locked_until' in {column['name'] for column in inspector.get_columns('orders')}
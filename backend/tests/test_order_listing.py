@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from models import Order
+from utils.order_listing import (
+    build_order_filters, decode_cursor, dump_order_listing, encode_cursor, list_order_rows, LISTING_FIELDS
+)
+
+ID = LISTING_FIELDS.index('id')
+
+
+@pytest.fixture
+def orders(db):
+    """Seven orders over three timestamps, so pages have to break ties on id"""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    orders = [Order(order_id=f'ORD-TEST-{i}', customer_email='buyer@example.com',
+                    package_id='chatgpt_plus_1_month', amount=25000, payment_method='QRIS',
+                    payment_status='paid' if i % 2 else 'pending',
+                    created_at=base + timedelta(minutes=i // 3))
+              for i in range(7)]
+    db.session.add_all(orders)
+    db.session.commit()
+    return orders
+
+
+def _all_pages(conditions, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = list_order_rows(conditions, cursor, limit)
+        pages.append([row[ID] for row in rows])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('args', [{'payment_status': 'bogus'}, {'invitation_status': 'PAID'}])
+def test_unknown_status_filter_is_rejected(args):
+    with pytest.raises(ValueError, match='Invalid'):
+        build_order_filters(args)
+
+
+def test_unknown_status_filter_is_a_bad_request(client):
+    response = client.get('/api/admin/orders?payment_status=bogus')
+    assert response.status_code == 400
+    assert 'payment_status' in response.get_json()['error']
+
+
+def test_known_filters_become_conditions():
+    conditions = build_order_filters({'payment_status': 'paid', 'invitation_status': 'manual_review_required',
+                                      'package_id': 'anything', 'created_from': '2026-01-01'})
+    assert len(conditions) == 4
+
+
+def test_listing_serializes_numeric_amounts_from_the_old_schema():
+    row = tuple(Decimal('25000.00') if field == 'amount' else None for field in LISTING_FIELDS)
+    assert orjson.loads(dump_order_listing([row]))['orders'][0]['amount'] == 25000
+
+
+def test_cursor_round_trip():
+    order = Order(id=42, created_at=datetime(2026, 1, 1, 12, 30, 15, 123456))
+    assert decode_cursor(encode_cursor(order)) == (order.created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not base64!', 'bm8tc2VwYXJhdG9y', 'MjAyNi0wMS0wMXx4'])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_malformed_cursor_is_a_bad_request(client):
+    assert client.get('/api/admin/orders?cursor=bm8tc2VwYXJhdG9y').status_code == 400
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 7])
+def test_pages_break_created_at_ties_by_id(orders, limit):
+    newest_first = [order.id for order in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+
+    pages = _all_pages([], limit)
+
+    assert [pk for page in pages for pk in page] == newest_first
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_pages_apply_the_filters(orders):
+    paid = build_order_filters({'payment_status': 'paid'})
+    ids = [pk for page in _all_pages(paid, 2) for pk in page]
+    assert sorted(ids) == sorted(order.id for order in orders if order.payment_status == 'paid')
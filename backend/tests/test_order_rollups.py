@@ -0,0 +1,80 @@
+from collections import Counter
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from models import OrderDailyRollup
+from utils.order_rollups import (
+    add_rollup_deltas, get_order_stats, record_invitation_failure, record_order_created, record_transitions
+)
+
+DAY = date(2026, 1, 1)
+
+
+def _order(payment_method='QRIS', amount=25000, day=DAY, package_id='chatgpt_plus_1_month'):
+    return SimpleNamespace(created_at=datetime.combine(day, datetime.min.time()).replace(hour=9),
+                           package_id=package_id, payment_method=payment_method, amount=amount)
+
+
+def _rollups(db):
+    return db.session.execute(
+        db.select(OrderDailyRollup).order_by(OrderDailyRollup.day, OrderDailyRollup.payment_method)
+    ).scalars().all()
+
+
+def test_deltas_accumulate_into_one_row_per_key(db):
+    key = (DAY, 'chatgpt_plus_1_month', 'QRIS')
+    add_rollup_deltas({key: Counter(orders_created=2)})
+    add_rollup_deltas({key: Counter(orders_created=1, orders_paid=1, revenue=25000)})
+    add_rollup_deltas({})
+
+    [rollup] = _rollups(db)
+    assert (rollup.orders_created, rollup.orders_paid, rollup.revenue) == (3, 1, 25000)
+    assert rollup.orders_expired == 0
+
+
+def test_orders_are_counted_per_day_and_payment_method(db):
+    record_order_created(_order())
+    record_order_created(_order())
+    record_order_created(_order(payment_method=None))
+    record_order_created(_order(day=date(2026, 1, 2)))
+
+    assert [(r.day, r.payment_method, r.orders_created) for r in _rollups(db)] == [
+        (DAY, '', 1), (DAY, 'QRIS', 2), (date(2026, 1, 2), 'QRIS', 1)
+    ]
+
+
+def test_transitions_count_their_status_and_paid_revenue(db):
+    rows = [_order(amount=25000), _order(amount=50000)]
+    record_transitions(rows, {'payment_status': 'paid', 'invitation_status': 'processing'})
+    record_transitions(rows[:1], {'payment_status': 'expired'})
+    record_transitions(rows[:1], {'invitation_status': 'sent'})
+    # Statuses without a counter, and empty transitions, write nothing
+    record_transitions(rows, {'payment_status': 'pending'})
+    record_transitions([], {'payment_status': 'paid'})
+
+    [rollup] = _rollups(db)
+    assert (rollup.orders_paid, rollup.revenue) == (2, 75000)
+    assert rollup.orders_expired == 1
+    assert rollup.invitations_sent == 1
+    assert rollup.orders_created == 0
+
+
+def test_each_invitation_failure_is_counted(db):
+    record_invitation_failure(_order())
+    record_invitation_failure(_order())
+
+    assert _rollups(db)[0].invitation_failures == 2
+
+
+def test_stats_sum_the_rollups(db):
+    record_order_created(_order())
+    record_order_created(_order(payment_method='BRIVA'))
+    record_transitions([_order()], {'payment_status': 'paid'})
+    record_transitions([_order()], {'invitation_status': 'sent'})
+
+    [stats] = get_order_stats(DAY, DAY)
+    assert stats['day'] == DAY.isoformat()
+    assert (stats['orders_created'], stats['orders_paid'], stats['revenue']) == (2, 1, 25000)
+    assert (stats['conversion_rate'], stats['invitation_success_rate']) == (0.5, 1.0)
+    assert [entry['payment_method'] for entry in get_order_stats(DAY, DAY, 'payment_method')] == ['BRIVA', 'QRIS']
+    assert get_order_stats(date(2026, 2, 1), date(2026, 2, 1)) == []
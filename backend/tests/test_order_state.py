@@ -0,0 +1,131 @@
+import pytest
+
+import tasks
+from models import Order, OrderDailyRollup
+from utils.order_state import apply_payment_status, claim_invitation, expire_orders, finish_invitation
+
+
+@pytest.fixture
+def order(db):
+    order = Order(order_id='ORD-TEST-1', customer_email='buyer@example.com',
+                  package_id='chatgpt_plus_1_month', amount=25000, payment_method='QRIS')
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+@pytest.fixture(params=[True, False], ids=['returning', 'select-for-update'])
+def update_returning(request, db):
+    """Run against both transition paths: UPDATE ... RETURNING, and the MySQL one without it"""
+    dialect = db.engine.dialect
+    original = dialect.update_returning
+    dialect.update_returning = request.param
+    yield request.param
+    dialect.update_returning = original
+
+
+def _reload(db, order):
+    db.session.expire_all()
+    return db.session.get(Order, order.id)
+
+
+def _rollup(db):
+    return db.session.execute(db.select(OrderDailyRollup)).scalar_one()
+
+
+def test_duplicate_paid_is_a_noop(db, order, update_returning):
+    first = apply_payment_status(order.order_id, 'paid')
+    db.session.commit()
+    second = apply_payment_status(order.order_id, 'paid')
+    db.session.commit()
+
+    assert first.payment_status == 'paid'
+    assert second is None
+    assert _rollup(db).orders_paid == 1
+    assert _rollup(db).revenue == 25000
+
+
+def test_second_claim_loses_while_the_lease_holds(db, order, update_returning):
+    apply_payment_status(order.order_id, 'paid')
+    first = claim_invitation(order.id, 900)
+    second = claim_invitation(order.id, 900)
+    db.session.commit()
+
+    assert first.invitation_status == 'processing'
+    assert first.invitation_locked_until is not None
+    assert second is None
+
+
+def test_expired_lease_can_be_claimed_again(db, order, update_returning):
+    apply_payment_status(order.order_id, 'paid')
+    first = claim_invitation(order.id, -1)  # A run whose lease ran out
+    db.session.commit()
+
+    second = claim_invitation(order.id, 900)
+    db.session.commit()
+
+    assert second is not None
+    # The first run lost the order and can no longer finish it
+    assert finish_invitation(order.id, 'failed', claim=first) is None
+    assert finish_invitation(order.id, 'sent', claim=second).invitation_status == 'sent'
+
+
+def test_sent_is_final(db, order, update_returning):
+    apply_payment_status(order.order_id, 'paid')
+    claim = claim_invitation(order.id, 900)
+    finish_invitation(order.id, 'sent', claim=claim)
+    db.session.commit()
+
+    assert claim_invitation(order.id, 900) is None
+    assert finish_invitation(order.id, 'failed') is None
+    assert _reload(db, order).invitation_status == 'sent'
+
+
+def test_late_paid_after_expiry_wins(db, order, update_returning):
+    expired = expire_orders([order.order_id])
+    db.session.commit()
+    paid = apply_payment_status(order.order_id, 'paid')
+    db.session.commit()
+
+    assert len(expired) == 1
+    assert paid.payment_status == 'paid'
+    assert paid.invitation_status == 'processing'
+    assert expire_orders([order.order_id]) == []
+    assert _reload(db, order).payment_status == 'paid'
+    rollup = _rollup(db)
+    assert (rollup.orders_expired, rollup.orders_paid) == (1, 1)
+
+
+def test_failed_run_without_the_claim_leaves_the_order_alone(db, order, monkeypatch):
+    apply_payment_status(order.order_id, 'paid')
+    other_run = claim_invitation(order.id, 900)
+    db.session.commit()
+
+    def claim_fails(order_pk, lease_seconds):
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(tasks, 'claim_invitation', claim_fails)
+    # Last attempt, so the eager run does not retry itself
+    tasks.process_invitation_task.apply(args=[order.id], retries=3)
+
+    reloaded = _reload(db, order)
+    assert reloaded.invitation_status == 'processing'
+    assert reloaded.invitation_locked_until == other_run.invitation_locked_until
+    assert reloaded.invitation_logs == []
+
+
+def test_failed_run_with_the_claim_marks_the_order_failed(db, order, monkeypatch):
+    apply_payment_status(order.order_id, 'paid')
+    db.session.commit()
+
+    def inviter_crashes(**kwargs):
+        raise RuntimeError('browser crashed')
+
+    monkeypatch.setattr(tasks, 'create_inviter', inviter_crashes)
+    tasks.process_invitation_task.apply(args=[order.id], retries=3)
+
+    reloaded = _reload(db, order)
+    assert reloaded.invitation_status == 'failed'
+    assert reloaded.invitation_locked_until is None
+    assert [log.status for log in reloaded.invitation_logs] == ['processing', 'failure']
+    assert _rollup(db).invitation_failures == 1
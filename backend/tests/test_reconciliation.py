@@ -0,0 +1,82 @@
+import importlib.util
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.serving import make_server
+
+import tasks
+import utils.tripay_client
+from models import Order, WebhookEvent
+from utils.reconciliation import reconcile_pending_payments
+
+STUB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'tripay_stub_server.py')
+
+
+@pytest.fixture
+def tripay_stub(app, monkeypatch):
+    """scripts/tripay_stub_server.py on a free local port, as the Tripay API"""
+    spec = importlib.util.spec_from_file_location('tripay_stub_server', STUB_PATH)
+    stub = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(stub)
+
+    server = make_server('127.0.0.1', 0, stub.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setitem(app.config, 'TRIPAY_BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setattr(utils.tripay_client, '_client', None)
+    yield stub
+    server.shutdown()
+    thread.join()
+
+
+def _order(db, stub, tripay_status, payment_status='pending', age=timedelta(minutes=10)):
+    """An order whose Tripay transaction now has tripay_status, without a callback"""
+    client = stub.app.test_client()
+    order_id = f'ORD-TEST-{len(stub.transactions)}'
+    created = client.post('/transaction/create', headers={'Authorization': 'Bearer test'},
+                          json={'merchant_ref': order_id, 'method': 'QRIS', 'amount': 25000}).get_json()
+    reference = created['data']['reference']
+    client.post(f'/_stub/transactions/{reference}', json={'status': tripay_status, 'callback': False})
+
+    now = datetime.utcnow()
+    db.session.add(Order(order_id=order_id, customer_email='buyer@example.com', package_id='chatgpt_plus_1_month',
+                         amount=25000, payment_method='QRIS', reference=reference, payment_status=payment_status,
+                         created_at=now - timedelta(hours=23) if payment_status == 'expired' else now - age,
+                         updated_at=now - age))
+    db.session.commit()
+    return order_id
+
+
+def _status(db, order_id):
+    db.session.expire_all()
+    return db.session.execute(db.select(Order.payment_status).filter_by(order_id=order_id)).scalar_one()
+
+
+def test_missed_callbacks_are_recorded_for_pending_and_recently_expired_orders(db, tripay_stub):
+    pending_paid = _order(db, tripay_stub, 'PAID')
+    expired_paid = _order(db, tripay_stub, 'PAID', payment_status='expired')
+    still_expired = _order(db, tripay_stub, 'EXPIRED', payment_status='expired')
+    expired_long_ago = _order(db, tripay_stub, 'PAID', payment_status='expired', age=timedelta(hours=2))
+    _order(db, tripay_stub, 'UNPAID')
+    _order(db, tripay_stub, 'PAID', age=timedelta(seconds=30))  # Its callback may still arrive
+
+    assert reconcile_pending_payments() == {'checked': 4, 'recorded': 2, 'rate_limited': False}
+    assert sorted(event.merchant_ref for event in WebhookEvent.query.all()) == sorted([pending_paid, expired_paid])
+
+    tasks.drain_webhook_events()
+    assert _status(db, pending_paid) == 'paid'
+    assert _status(db, expired_paid) == 'paid'
+    assert _status(db, still_expired) == 'expired'
+    assert _status(db, expired_long_ago) == 'expired'
+
+    # Paid orders are no longer polled
+    assert reconcile_pending_payments() == {'checked': 2, 'recorded': 0, 'rate_limited': False}
+
+
+def test_expired_orders_are_skipped_when_the_window_is_off(app, db, tripay_stub, monkeypatch):
+    monkeypatch.setitem(app.config, 'RECONCILE_EXPIRED_WINDOW', 0)
+    _order(db, tripay_stub, 'PAID', payment_status='expired')
+
+    assert reconcile_pending_payments()['checked'] == 0
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+
+import tasks
+from models import Order, OutboxEvent, WebhookEvent
+from utils.webhook_events import record_webhook_event
+
+
+@pytest.fixture
+def order(db):
+    order = Order(order_id='ORD-TEST-1', customer_email='buyer@example.com',
+                  package_id='chatgpt_plus_1_month', amount=25000, payment_method='QRIS')
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _callback(order, status='PAID', reference='T-1'):
+    return {'merchant_ref': order.order_id, 'reference': reference, 'status': status,
+            'total_amount': 25000, 'signature': 'not stored'}
+
+
+def test_redelivered_callback_is_rejected(db, order):
+    first = record_webhook_event(_callback(order))
+    redelivered = record_webhook_event(_callback(order))
+    next_status = record_webhook_event(_callback(order, status='EXPIRED'))
+
+    assert first is not None
+    assert 'signature' not in first.payload
+    assert redelivered is None
+    assert next_status is not None
+    assert WebhookEvent.query.count() == 2
+
+
+def test_paid_event_is_applied_once(db, order):
+    record_webhook_event(_callback(order))
+
+    processed, changed = tasks.drain_webhook_events()
+    assert (processed, len(changed)) == (1, 1)
+    assert db.session.get(Order, order.id).payment_status == 'paid'
+    assert sorted(event.event_type for event in OutboxEvent.query.all()) == \
+        ['email.payment_confirmation', 'invitation.requested']
+
+    assert tasks.drain_webhook_events() == (0, [])
+
+
+def test_failed_event_backs_off_instead_of_using_up_its_attempts(db, order, monkeypatch):
+    record_webhook_event(_callback(order))
+
+    def lock_timeout(event):
+        raise RuntimeError('lock wait timeout')
+
+    monkeypatch.setattr(tasks, 'apply_webhook_event', lock_timeout)
+    # A full batch every time, so the run would loop over the same event without the backoff
+    assert tasks.drain_webhook_events(batch_size=1, max_batches=10) == (0, [])
+
+    event = WebhookEvent.query.one()
+    assert event.attempts == 1
+    assert event.last_error == 'lock wait timeout'
+    assert event.processed_at is None
+    assert event.available_at > datetime.utcnow()
@@ -0,0 +1,74 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from flask import Flask
+
+from utils.webhook_filter import WebhookFilter
+
+KEY = 'private-key'
+BODY = json.dumps({'merchant_ref': 'ORD-1', 'reference': 'T-1', 'status': 'PAID'}).encode()
+
+
+def _sign(body, key=KEY):
+    return hmac.new(key.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _check(webhook_filter, body=BODY, signature=None, remote_addr='203.0.113.7', headers=None):
+    headers = dict(headers or {})
+    if signature is not None:
+        headers['X-Callback-Signature'] = signature
+    with Flask(__name__).test_request_context('/callback/tripay', method='POST', data=body, headers=headers,
+                                              content_type='application/json',
+                                              environ_base={'REMOTE_ADDR': remote_addr}) as ctx:
+        return webhook_filter.check(ctx.request)
+
+
+def test_valid_signature_is_accepted():
+    webhook_filter = WebhookFilter(KEY)
+    assert _check(webhook_filter, signature=_sign(BODY)) is None
+    assert _check(webhook_filter, signature=_sign(BODY).upper() + ' ') is None
+    assert webhook_filter.counters['accepted'] == 2
+
+
+@pytest.mark.parametrize('signature, reason', [
+    (None, 'missing_signature'),
+    ('', 'missing_signature'),
+    (_sign(BODY, 'other-key'), 'bad_signature'),
+    (_sign(BODY + b' '), 'bad_signature'),
+])
+def test_missing_or_wrong_signature_is_rejected(signature, reason):
+    webhook_filter = WebhookFilter(KEY)
+    assert _check(webhook_filter, signature=signature) == ('Invalid signature', 401)
+    assert webhook_filter.counters == {reason: 1}
+
+
+def test_oversized_body_is_rejected_before_hashing():
+    webhook_filter = WebhookFilter(KEY, max_body_bytes=16)
+    assert _check(webhook_filter, signature=_sign(BODY)) == ('Invalid body', 400)
+    assert webhook_filter.counters == {'bad_length': 1}
+
+
+def test_source_must_be_in_an_allowed_network():
+    webhook_filter = WebhookFilter(KEY, allowed_ips=['203.0.113.0/28', ' ', 'not-a-network'])
+    assert _check(webhook_filter, signature=_sign(BODY), remote_addr='203.0.113.7') is None
+    assert _check(webhook_filter, signature=_sign(BODY), remote_addr='198.51.100.1') == ('Forbidden', 403)
+
+
+def test_real_ip_header_is_only_trusted_from_a_proxy():
+    webhook_filter = WebhookFilter(KEY, allowed_ips=['203.0.113.7'], trusted_proxies=['10.0.0.0/8'])
+    via_proxy = {'X-Real-IP': '203.0.113.7'}
+
+    assert _check(webhook_filter, signature=_sign(BODY), remote_addr='10.1.2.3', headers=via_proxy) is None
+    # A client cannot claim an allowed address itself
+    assert _check(webhook_filter, signature=_sign(BODY), remote_addr='198.51.100.1',
+                  headers=via_proxy) == ('Forbidden', 403)
+    assert _check(webhook_filter, signature=_sign(BODY), remote_addr='10.1.2.3',
+                  headers={'X-Real-IP': 'garbage'}) == ('Forbidden', 403)
+
+
+def test_callback_routes_are_guarded(client):
+    response = client.post('/api/payment/webhook', data=BODY, content_type='application/json')
+    assert response.status_code == 401
+    assert client.post('/callback/tripay', data=BODY, content_type='application/json').status_code == 401
@@ -0,0 +1,148 @@
+import json
+import uuid
+import logging
+import redis
+from contextlib import contextmanager
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Global client instance
+_client = None
+
+def get_redis():
+    """Factory function to get the shared Redis client used for caching"""
+    global _client
+    if _client is None:
+        timeout = current_app.config.get('CACHE_SOCKET_TIMEOUT', 0.5)
+        _client = redis.Redis.from_url(
+            current_app.config.get('CACHE_REDIS_URL', current_app.config['REDIS_URL']),
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout
+        )
+    return _client
+
+def cache_get_json(key):
+    """
+    Read a JSON value from Redis
+
+    Returns:
+        The decoded value, or None on a miss or when Redis is unavailable
+    """
+    try:
+        raw = get_redis().get(key)
+        return json.loads(raw) if raw is not None else None
+    except (redis.RedisError, ValueError) as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+def cache_set_json(key, value, ttl):
+    """Store a JSON value in Redis with a TTL (seconds). Returns True on success."""
+    try:
+        get_redis().set(key, json.dumps(value), ex=ttl)
+        return True
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+        return False
+
+def cache_delete(*keys):
+    """Delete one or more keys from Redis, ignoring connection errors"""
+    if not keys:
+        return
+    try:
+        get_redis().delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed for {keys}: {str(e)}")
+
+def cache_get_many_json(keys):
+    """
+    Read several JSON values in one round trip
+
+    Returns:
+        list: Decoded values in key order, None for misses (all None if Redis is unavailable)
+    """
+    if not keys:
+        return []
+    try:
+        values = get_redis().mget(keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache multi-read failed: {str(e)}")
+        return [None] * len(keys)
+
+    results = []
+    for raw in values:
+        try:
+            results.append(json.loads(raw) if raw is not None else None)
+        except ValueError:
+            results.append(None)
+    return results
+
+# Skip the write when the cached value carries a later updated_at (ISO strings compare in time order)
+_SET_IF_NEWER_SCRIPT = """
+local current = redis.call('get', KEYS[1])
+if current then
+    local ok, decoded = pcall(cjson.decode, current)
+    if ok and type(decoded) == 'table' and type(decoded['updated_at']) == 'string'
+            and decoded['updated_at'] > ARGV[2] then
+        return 0
+    end
+end
+redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+def cache_set_many_json(items, ttl, if_newer=False):
+    """
+    Store several JSON values with the same TTL using one pipelined round trip
+
+    With if_newer, values are only written over cached ones with an older
+    (or no) updated_at, for payloads that may have been read from a lagging replica.
+    """
+    if not items:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key, value in items.items():
+            if if_newer:
+                pipe.eval(_SET_IF_NEWER_SCRIPT, 1, key, json.dumps(value), value.get('updated_at') or '', ttl)
+            else:
+                pipe.set(key, json.dumps(value), ex=ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Cache multi-write failed: {str(e)}")
+
+# Delete the lock only if it still holds our token, so an expired lock taken over by another run is left alone
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+@contextmanager
+def redis_lock(key, ttl):
+    """
+    Hold a Redis lock for the duration of a block
+
+    Yields True if the lock was taken, False if another holder has it. If
+    Redis is unavailable the block runs anyway (yields True), so only use
+    this for work that is safe to run twice.
+    """
+    token = uuid.uuid4().hex
+    held = False
+    try:
+        held = bool(get_redis().set(key, token, nx=True, ex=ttl))
+        acquired = held
+    except redis.RedisError as e:
+        logger.warning(f"Lock {key} unavailable, running without it: {str(e)}")
+        acquired = True
+
+    try:
+        yield acquired
+    finally:
+        if held:
+            try:
+                get_redis().eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to release lock {key}, it expires in {ttl}s: {str(e)}")
@@ -0,0 +1,98 @@
+import time
+import logging
+import threading
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, NullPool
+
+logger = logging.getLogger(__name__)
+
+class _PoolMetricsMixin:
+    """Times every checkout, including waits for a free connection, pre-ping and reconnects"""
+
+    slow_checkout_ms = 100
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkout_metrics = {'checkouts': 0, 'timeouts': 0, 'slow': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0}
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._record_checkout((time.perf_counter() - started) * 1000, timed_out)
+
+    def _record_checkout(self, wait_ms, timed_out):
+        with self._metrics_lock:
+            metrics = self.checkout_metrics
+            metrics['checkouts'] += 1
+            metrics['timeouts'] += timed_out
+            metrics['wait_ms_total'] += wait_ms
+            metrics['wait_ms_max'] = max(metrics['wait_ms_max'], wait_ms)
+            if wait_ms >= self.slow_checkout_ms:
+                metrics['slow'] += 1
+        if timed_out:
+            logger.error(f"Database pool exhausted after waiting {wait_ms:.0f} ms ({self.status()})")
+        elif wait_ms >= self.slow_checkout_ms:
+            logger.warning(f"Slow database pool checkout: {wait_ms:.0f} ms ({self.status()})")
+
+class InstrumentedQueuePool(_PoolMetricsMixin, QueuePool):
+    pass
+
+class InstrumentedNullPool(_PoolMetricsMixin, NullPool):
+    pass
+
+def build_engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for this process role (web, worker or beat)
+
+    Behind PgBouncer in transaction mode PgBouncer does the pooling, so each
+    checkout opens a fresh connection to it and nothing is held between
+    transactions. SQLite keeps SQLAlchemy's defaults.
+    """
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return {}
+
+    role = config.get('PROCESS_ROLE', 'web')
+    pool_size, max_overflow = config['DB_POOL_SIZES'].get(role, config['DB_POOL_SIZES']['web'])
+    _PoolMetricsMixin.slow_checkout_ms = config.get('DB_POOL_SLOW_CHECKOUT_MS', 100)
+
+    if config.get('DB_PGBOUNCER'):
+        return {'poolclass': InstrumentedNullPool}
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_use_lifo': True  # Lets surplus connections go idle so pool_recycle can retire them
+    }
+
+def get_pool_stats(db):
+    """
+    Connection pool usage and checkout wait times for every engine in this process
+
+    Returns:
+        dict: bind name ('default' for the primary) -> stats
+    """
+    stats = {}
+    for bind_key, engine in db.engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__, 'status': pool.status()}
+        if isinstance(pool, QueuePool):
+            entry.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        metrics = dict(getattr(pool, 'checkout_metrics', {}))
+        if metrics.get('checkouts'):
+            metrics['wait_ms_avg'] = round(metrics['wait_ms_total'] / metrics['checkouts'], 2)
+            metrics['wait_ms_max'] = round(metrics['wait_ms_max'], 2)
+            del metrics['wait_ms_total']
+            entry['checkout'] = metrics
+        stats[bind_key or 'default'] = entry
+    return stats
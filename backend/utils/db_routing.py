@@ -0,0 +1,83 @@
+import logging
+from functools import wraps
+from flask import current_app, g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql import Select, CompoundSelect
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to the read replica inside read_replica views
+
+    Everything else goes to the primary: writes, raw SQL, Celery tasks and
+    requests not marked read-only. Once a session has written, it stays on
+    the primary until it is removed at the end of the request, so reads
+    that follow a write see it.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if isinstance(clause, UpdateBase):
+                self.info['pinned_to_primary'] = True
+            elif isinstance(clause, (Select, CompoundSelect)) and not self._flushing and reading_from_replica(self):
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _pin_to_primary(session, flush_context):
+    session.info['pinned_to_primary'] = True
+
+def read_replica(view):
+    """Mark a view as read-only so its SELECTs may be served by the replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def reading_from_replica(session):
+    """True when the session's reads in this request are being served by the replica"""
+    return (
+        has_request_context()
+        and g.get('read_replica', False)
+        and REPLICA_BIND in current_app.config.get('SQLALCHEMY_BINDS', {})
+        and not session.info.get('pinned_to_primary')
+    )
+
+def pin_to_primary(session):
+    """Send the rest of this request's reads to the primary, e.g. to re-check a miss caused by replica lag"""
+    session.info['pinned_to_primary'] = True
+
+def get_replica_lag(db):
+    """
+    How far the replica is behind the primary
+
+    Returns:
+        dict: configured flag plus lag_seconds (None if the database cannot tell) or an error
+    """
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        return {'configured': False}
+
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                # An idle primary stops advancing the replay timestamp, so count a caught-up replica as 0
+                lag = conn.execute(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )).scalar()
+            elif engine.dialect.name == 'mysql':
+                row = conn.execute(text('SHOW REPLICA STATUS')).mappings().first()
+                lag = row.get('Seconds_Behind_Source') if row else None
+            else:
+                lag = None
+        return {'configured': True, 'lag_seconds': float(lag) if lag is not None else None}
+    except Exception as e:
+        logger.warning(f"Replica lag check failed: {str(e)}")
+        return {'configured': True, 'lag_seconds': None, 'error': 'unavailable'}
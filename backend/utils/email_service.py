@@ -4,6 +4,8 @@ from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content
 from flask import current_app, render_template_string
 
+from utils.package_catalog import get_package
+
 logger = logging.getLogger(__name__)
 
 class EmailService:
@@ -63,8 +65,7 @@ def send_invitation_confirmation(order):
         email_service = get_email_service()
         
         # Get package info
-        packages = current_app.config.get('PACKAGES', {})
-        package = packages.get(order.package_id, {})
+        package = get_package(order.package_id) or {}
         
         # Email template
         html_template = """
@@ -227,8 +228,7 @@ def send_payment_confirmation(order):
         email_service = get_email_service()
         
         # Get package info
-        packages = current_app.config.get('PACKAGES', {})
-        package = packages.get(order.package_id, {})
+        package = get_package(order.package_id) or {}
         
         html_template = """
         <!DOCTYPE html>
@@ -0,0 +1,84 @@
+import json
+import hashlib
+import logging
+import redis
+from flask import current_app
+
+from utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_PREFIX = 'idempotency:orders:'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+def fingerprint_payload(data):
+    """Build a stable hash of the request body so a reused key with a different body can be detected"""
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def claim_idempotency_key(key, fingerprint):
+    """
+    Claim an Idempotency-Key before processing a request
+
+    Args:
+        key (str): Client supplied Idempotency-Key header
+        fingerprint (str): Hash of the request body
+
+    Returns:
+        tuple: (state, record) where state is one of
+            'new'         - key claimed, caller should process the request
+            'replay'      - a response is stored in record['body'] / record['status_code']
+            'in_progress' - another request with this key is still running
+            'mismatch'    - key was used with a different request body
+    """
+    redis_key = IDEMPOTENCY_KEY_PREFIX + key
+    lock_ttl = current_app.config.get('IDEMPOTENCY_LOCK_TTL', 60)
+    placeholder = json.dumps({'state': 'in_progress', 'fingerprint': fingerprint})
+
+    try:
+        client = get_redis()
+        if client.set(redis_key, placeholder, nx=True, ex=lock_ttl):
+            return 'new', None
+
+        raw = client.get(redis_key)
+        if raw is None:
+            # Previous claim expired between SET and GET, try once more
+            if client.set(redis_key, placeholder, nx=True, ex=lock_ttl):
+                return 'new', None
+            return 'in_progress', None
+
+        record = json.loads(raw)
+    except (redis.RedisError, ValueError) as e:
+        # Fail open: the pending-order reuse check still protects against duplicates
+        logger.warning(f"Idempotency lookup failed for key {key}: {str(e)}")
+        return 'new', None
+
+    if record.get('fingerprint') != fingerprint:
+        return 'mismatch', record
+    if record.get('state') == 'in_progress':
+        return 'in_progress', record
+    return 'replay', record
+
+def store_idempotent_response(key, fingerprint, body, status_code):
+    """Persist the final response for a claimed key so retries replay it"""
+    record = {
+        'state': 'completed',
+        'fingerprint': fingerprint,
+        'status_code': status_code,
+        'body': body
+    }
+    try:
+        get_redis().set(
+            IDEMPOTENCY_KEY_PREFIX + key,
+            json.dumps(record),
+            ex=current_app.config.get('IDEMPOTENCY_TTL', 86400)
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to store idempotent response for key {key}: {str(e)}")
+
+def release_idempotency_key(key):
+    """Drop a claim so the client can retry after a non-cacheable failure"""
+    try:
+        get_redis().delete(IDEMPOTENCY_KEY_PREFIX + key)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to release idempotency key {key}: {str(e)}")
@@ -0,0 +1,98 @@
+import logging
+from sqlalchemy import select, insert, delete, and_, or_
+
+from models import db, Order, InvitationLog, ArchivedOrder, ArchivedInvitationLog
+from utils.db_routing import reading_from_replica, pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+# Orders that will not change again; manual_review_required still needs a person
+COMPLETED = or_(
+    Order.payment_status.in_(('expired', 'failed')),
+    and_(Order.payment_status == 'paid', Order.invitation_status == 'sent')
+)
+
+ORDER_COLUMNS = [
+    'id', 'order_id', 'customer_email', 'full_name', 'phone_number', 'package_id', 'amount',
+    'payment_status', 'invitation_status', 'checkout_url', 'payment_method', 'reference',
+    'expired_at', 'created_at', 'updated_at'
+]
+LOG_COLUMNS = ['id', 'order_id', 'attempt_timestamp', 'status', 'error_message', 'screenshot_path', 'retry_count']
+
+def archive_order_batch(cutoff, batch_size):
+    """
+    Move one batch of completed orders created before cutoff, with their logs, to the archive tables
+
+    Copy and delete run in one transaction so an order is always in exactly
+    one of the two tables.
+
+    Returns:
+        int: Number of orders archived
+    """
+    order_ids = db.session.execute(
+        select(Order.id).where(Order.created_at < cutoff, COMPLETED)
+        .order_by(Order.created_at).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not order_ids:
+        db.session.rollback()
+        return 0
+
+    try:
+        db.session.execute(insert(ArchivedOrder).from_select(
+            ORDER_COLUMNS,
+            select(*[getattr(Order, column) for column in ORDER_COLUMNS]).where(Order.id.in_(order_ids))
+        ))
+        db.session.execute(insert(ArchivedInvitationLog).from_select(
+            LOG_COLUMNS,
+            select(*[getattr(InvitationLog, column) for column in LOG_COLUMNS]).where(InvitationLog.order_id.in_(order_ids))
+        ))
+        db.session.execute(delete(InvitationLog).where(InvitationLog.order_id.in_(order_ids))
+                           .execution_options(synchronize_session=False))
+        db.session.execute(delete(Order).where(Order.id.in_(order_ids))
+                           .execution_options(synchronize_session=False))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(order_ids)
+
+def archive_completed_orders(cutoff, batch_size=500, max_batches=100):
+    """
+    Archive completed orders created before cutoff in batches
+
+    Returns:
+        list: Orders archived per batch
+    """
+    batches = []
+    for _ in range(max_batches):
+        archived = archive_order_batch(cutoff, batch_size)
+        if not archived:
+            break
+        batches.append(archived)
+        logger.info(f"Archived batch of {archived} orders")
+        if archived < batch_size:
+            break
+    return batches
+
+def find_archived_order(order_id):
+    """Slow-path lookup of an order that has been moved to the archive"""
+    return ArchivedOrder.query.filter_by(order_id=order_id).first()
+
+def find_order(order_id):
+    """
+    Look up an order by its public id, in the hot table first and then the archive
+
+    Returns:
+        tuple: (Order or ArchivedOrder or None, archived flag)
+    """
+    order = Order.query.filter_by(order_id=order_id).first()
+    if order:
+        return order, False
+    archived = find_archived_order(order_id)
+    if archived is None and reading_from_replica(db.session):
+        # A just-created order may not have reached the replica yet
+        pin_to_primary(db.session)
+        return find_order(order_id)
+    return archived, archived is not None
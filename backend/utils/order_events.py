@@ -0,0 +1,68 @@
+import json
+import time
+import logging
+import redis
+
+from utils.cache import get_redis
+from utils.order_status import cache_order_status, is_final_status
+
+logger = logging.getLogger(__name__)
+
+ORDER_CHANNEL_PREFIX = 'orders:status:'
+
+def order_channel(order_id):
+    """Redis pub/sub channel carrying status changes for one order"""
+    return ORDER_CHANNEL_PREFIX + order_id
+
+def publish_order_status(order):
+    """
+    Refresh the cached status of an order and publish it to its subscribers
+
+    Call after the status change is committed. Failures are logged only,
+    clients fall back to polling the status endpoint.
+    """
+    payload = cache_order_status(order)
+    try:
+        get_redis().publish(order_channel(order.order_id), json.dumps(payload))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish status for order {order.order_id}: {str(e)}")
+
+def subscribe_order_status(order_id):
+    """Open a pub/sub subscription for an order. Raises redis.RedisError if Redis is down."""
+    pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(order_channel(order_id))
+    return pubsub
+
+def _format_event(payload, event='status'):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def stream_order_status(pubsub, initial_payload, max_duration, keepalive_interval, retry_ms):
+    """
+    Generate Server-Sent Events for an order
+
+    Sends the current status first, then one event per published change.
+    Ends on a final status or after max_duration seconds; EventSource then
+    reconnects after retry_ms.
+    """
+    try:
+        yield f"retry: {retry_ms}\n"
+        yield _format_event(initial_payload)
+        if is_final_status(initial_payload):
+            return
+
+        deadline = time.monotonic() + max_duration
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=keepalive_interval)
+            if message is None:
+                # Comment line keeps nginx and the browser from timing out the connection
+                yield ": keepalive\n\n"
+                continue
+
+            payload = json.loads(message['data'])
+            yield _format_event(payload)
+            if is_final_status(payload):
+                return
+    except redis.RedisError as e:
+        logger.warning(f"Order status stream interrupted: {str(e)}")
+    finally:
+        pubsub.close()
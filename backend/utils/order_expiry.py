@@ -0,0 +1,60 @@
+import logging
+import time
+import redis
+from datetime import timezone
+
+from utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of pending order_ids scored by their Tripay expiry (unix seconds)
+EXPIRY_SCHEDULE_KEY = 'orders:expiry_schedule'
+
+def schedule_order_expiry(order_id, expires_at):
+    """
+    Schedule an order to be expired at its payment deadline
+
+    Failures are logged only, the hourly cleanup sweep still expires the order.
+
+    Args:
+        order_id (str): Public order_id
+        expires_at (datetime): Naive UTC deadline
+    """
+    try:
+        get_redis().zadd(EXPIRY_SCHEDULE_KEY, {order_id: expires_at.replace(tzinfo=timezone.utc).timestamp()})
+    except redis.RedisError as e:
+        logger.warning(f"Failed to schedule expiry for order {order_id}: {str(e)}")
+
+def claim_due_expiries(limit, now=None):
+    """
+    Take the order_ids whose deadline has passed off the schedule
+
+    Each id is removed with its own ZREM so that with several tickers every
+    id is claimed by exactly one of them.
+
+    Returns:
+        list: Claimed order_ids (empty if Redis is unavailable)
+    """
+    try:
+        client = get_redis()
+        due = client.zrangebyscore(EXPIRY_SCHEDULE_KEY, '-inf', now or time.time(), start=0, num=limit)
+        if not due:
+            return []
+
+        pipe = client.pipeline(transaction=False)
+        for order_id in due:
+            pipe.zrem(EXPIRY_SCHEDULE_KEY, order_id)
+        return [order_id for order_id, removed in zip(due, pipe.execute()) if removed]
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read the expiry schedule: {str(e)}")
+        return []
+
+def reschedule_expiries(order_ids, delay=30):
+    """Put claimed order_ids back on the schedule after a failed run"""
+    if not order_ids:
+        return
+    retry_at = time.time() + delay
+    try:
+        get_redis().zadd(EXPIRY_SCHEDULE_KEY, {order_id: retry_at for order_id in order_ids})
+    except redis.RedisError as e:
+        logger.warning(f"Failed to reschedule {len(order_ids)} expiries: {str(e)}")
@@ -0,0 +1,69 @@
+import io
+import csv
+import zlib
+import orjson
+from sqlalchemy import select
+
+from models import db, Order
+from utils.order_listing import LISTING_FIELDS, LISTING_COLUMNS, orjson_default
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+def iter_export_rows(conditions, yield_per=1000):
+    """
+    Orders matching the listing filters, oldest first, fetched from a server-side cursor
+
+    Rows are plain tuples in LISTING_FIELDS order and only yield_per of them
+    are held at a time, whatever the size of the export.
+    """
+    statement = (
+        select(*LISTING_COLUMNS).filter(*conditions)
+        .order_by(Order.created_at, Order.id)
+        .execution_options(yield_per=yield_per)
+    )
+    result = db.session.execute(statement)
+    try:
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        result.close()
+
+def iter_csv(rows, chunk_bytes=65536):
+    """Encode rows as CSV with a header, in chunks of about chunk_bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(LISTING_FIELDS)
+    for row in rows:
+        writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def iter_ndjson(rows, chunk_bytes=65536):
+    """Encode rows as one JSON object per line, in chunks of about chunk_bytes"""
+    lines = []
+    size = 0
+    for row in rows:
+        line = orjson.dumps(dict(zip(LISTING_FIELDS, row)), default=orjson_default,
+                            option=orjson.OPT_APPEND_NEWLINE)
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b''.join(lines)
+            lines = []
+            size = 0
+    yield b''.join(lines)
+
+def iter_gzip(chunks):
+    """Compress a stream of byte chunks into a single gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes the gzip header
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
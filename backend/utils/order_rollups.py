@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from models import db, OrderDailyRollup
+
+COUNTERS = (
+    'orders_created', 'orders_paid', 'orders_expired', 'orders_failed', 'revenue',
+    'invitations_sent', 'invitation_failures', 'invitations_manual_review'
+)
+
+# Status a transition writes -> counter it bumps. invitation_failures counts
+# failure logs instead, see record_invitation_failure.
+PAYMENT_COUNTERS = {'paid': 'orders_paid', 'expired': 'orders_expired', 'failed': 'orders_failed'}
+INVITATION_COUNTERS = {'sent': 'invitations_sent', 'manual_review_required': 'invitations_manual_review'}
+
+STATS_GROUPS = {
+    'day': OrderDailyRollup.day,
+    'package_id': OrderDailyRollup.package_id,
+    'payment_method': OrderDailyRollup.payment_method,
+}
+
+def _rollup_key(order):
+    return order.created_at.date(), order.package_id, order.payment_method or ''
+
+def add_rollup_deltas(deltas):
+    """
+    Add counter deltas to the rollup rows in one upsert, inside the caller's transaction
+
+    Args:
+        deltas (dict): (day, package_id, payment_method) -> Counter of COUNTERS
+    """
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    # Sorted so concurrent transactions lock rollup rows in the same order and cannot deadlock
+    rows = [
+        dict(day=day, package_id=package_id, payment_method=payment_method, updated_at=now,
+             **{counter: deltas[(day, package_id, payment_method)][counter] for counter in COUNTERS})
+        for day, package_id, payment_method in sorted(deltas)
+    ]
+
+    dialect = db.session.get_bind().dialect.name
+    table = OrderDailyRollup.__table__
+    if dialect == 'mysql':
+        stmt = mysql.insert(table).values(rows)
+        added = {counter: table.c[counter] + stmt.inserted[counter] for counter in COUNTERS}
+        stmt = stmt.on_duplicate_key_update(updated_at=stmt.inserted.updated_at, **added)
+    else:
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table).values(rows)
+        added = {counter: table.c[counter] + stmt.excluded[counter] for counter in COUNTERS}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'package_id', 'payment_method'],
+            set_=dict(added, updated_at=stmt.excluded.updated_at)
+        )
+    db.session.execute(stmt)
+
+def record_order_created(order):
+    """Count a new order, call before the transaction that inserts it commits"""
+    add_rollup_deltas({_rollup_key(order): Counter(orders_created=1)})
+
+def record_invitation_failure(order):
+    """Count a failed invitation attempt, call in the transaction that writes its 'failure' log"""
+    add_rollup_deltas({_rollup_key(order): Counter(invitation_failures=1)})
+
+def record_transitions(rows, values):
+    """
+    Count the orders a status transition just changed
+
+    Args:
+        rows (list): Changed rows, with created_at, package_id, payment_method and amount
+        values (dict): The columns the transition wrote
+    """
+    payment_counter = PAYMENT_COUNTERS.get(values.get('payment_status'))
+    invitation_counter = INVITATION_COUNTERS.get(values.get('invitation_status'))
+    if not rows or not (payment_counter or invitation_counter):
+        return
+
+    deltas = defaultdict(Counter)
+    for row in rows:
+        counts = deltas[_rollup_key(row)]
+        if payment_counter:
+            counts[payment_counter] += 1
+            if payment_counter == 'orders_paid':
+                counts['revenue'] += row.amount
+        if invitation_counter:
+            counts[invitation_counter] += 1
+    add_rollup_deltas(deltas)
+
+def get_order_stats(start, end, group_by='day'):
+    """
+    Sales and invitation stats for orders created in [start, end], from the rollups
+
+    Args:
+        start (date): First day, inclusive
+        end (date): Last day, inclusive
+        group_by (str): 'day', 'package_id' or 'payment_method'
+
+    Returns:
+        list: One dict per group with the summed counters and rates
+    """
+    group = STATS_GROUPS[group_by]
+    statement = (
+        select(group, *[func.sum(getattr(OrderDailyRollup, counter)) for counter in COUNTERS])
+        .where(OrderDailyRollup.day >= start, OrderDailyRollup.day <= end)
+        .group_by(group).order_by(group)
+    )
+
+    stats = []
+    for key, *totals in db.session.execute(statement).all():
+        entry = {group_by: key.isoformat() if group_by == 'day' else key}
+        entry.update((counter, int(total or 0)) for counter, total in zip(COUNTERS, totals))
+        created, paid = entry['orders_created'], entry['orders_paid']
+        entry['conversion_rate'] = round(paid / created, 4) if created else None
+        entry['invitation_success_rate'] = round(entry['invitations_sent'] / paid, 4) if paid else None
+        stats.append(entry)
+    return stats
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import update, select, or_
+
+from models import db, Order
+from utils.order_rollups import record_transitions
+
+# new payment_status -> statuses it may be reached from. A late PAID callback
+# still wins over expired/failed; nothing moves an order out of 'paid'.
+PAYMENT_TRANSITIONS = {
+    'paid': ('pending', 'expired', 'failed'),
+    'expired': ('pending',),
+    'failed': ('pending',),
+    'pending': ()
+}
+
+# Invitation states a worker may (re)claim, 'sent' and 'manual_review_required' are final
+CLAIMABLE_INVITATION_STATUSES = ('pending', 'processing', 'failed')
+
+# Columns returned by every transition, enough to build the public status payload,
+# to find the order's rollup row and to tell which invitation claim holds the order
+STATUS_COLUMNS = (
+    Order.id, Order.order_id, Order.customer_email,
+    Order.payment_status, Order.invitation_status, Order.updated_at,
+    Order.created_at, Order.package_id, Order.payment_method, Order.amount,
+    Order.invitation_locked_until
+)
+
+def _conditional_update(key_conditions, guard_conditions, values):
+    """
+    Apply an UPDATE only where the guard still holds and return the changed rows
+
+    Uses UPDATE ... RETURNING where the database supports it (PostgreSQL,
+    SQLite). MySQL has no RETURNING, so the rows passing the guard are
+    locked with SELECT ... FOR UPDATE first and then updated by id; the
+    returned rows are that selection with the written values applied.
+    The changed orders are counted in the daily rollups in the same transaction.
+
+    Returns:
+        list: Rows with STATUS_COLUMNS for every order that changed
+    """
+    if db.session.get_bind().dialect.update_returning:
+        stmt = update(Order).where(*key_conditions, *guard_conditions).values(**values) \
+            .execution_options(synchronize_session=False)
+        rows = db.session.execute(stmt.returning(*STATUS_COLUMNS)).all()
+    else:
+        selected = db.session.execute(
+            select(*STATUS_COLUMNS).where(*key_conditions, *guard_conditions).with_for_update()
+        ).all()
+        if selected:
+            db.session.execute(
+                update(Order).where(Order.id.in_([row.id for row in selected])).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        rows = [SimpleNamespace(**dict(row._asdict(), **values)) for row in selected]
+
+    record_transitions(rows, values)
+    return rows
+
+def apply_payment_status(order_ref, new_status):
+    """
+    Move an order to a new payment status if the state machine allows it
+
+    Args:
+        order_ref (str): The public order_id (Tripay merchant_ref)
+        new_status (str): Target payment_status
+
+    Returns:
+        Row: The updated status columns, or None if the order is missing or
+        the transition is a no-op (e.g. a redelivered PAID callback)
+    """
+    allowed_from = PAYMENT_TRANSITIONS.get(new_status, ())
+    if not allowed_from:
+        return None
+
+    values = {'payment_status': new_status, 'updated_at': datetime.utcnow()}
+    if new_status == 'paid':
+        values['invitation_status'] = 'processing'
+
+    rows = _conditional_update(
+        [Order.order_id == order_ref],
+        [Order.payment_status.in_(allowed_from)],
+        values
+    )
+    return rows[0] if rows else None
+
+def expire_pending_orders(cutoff, limit=None):
+    """
+    Expire orders still pending since before cutoff
+
+    Candidates are picked oldest first through the (payment_status,
+    created_at) index; pass limit to expire them in chunks.
+
+    Returns:
+        list: Status rows of the orders that were expired by this call
+    """
+    candidates = select(Order.id).where(
+        Order.payment_status == 'pending',
+        Order.created_at < cutoff
+    ).order_by(Order.created_at)
+    if limit:
+        candidates = candidates.limit(limit)
+
+    order_ids = db.session.execute(candidates).scalars().all()
+    if not order_ids:
+        return []
+
+    return _conditional_update(
+        [Order.id.in_(order_ids)],
+        [Order.payment_status == 'pending'],
+        {'payment_status': 'expired', 'updated_at': datetime.utcnow()}
+    )
+
+def expire_orders(order_refs):
+    """
+    Expire specific orders if they are still pending
+
+    Args:
+        order_refs (list): Public order_ids
+
+    Returns:
+        list: Status rows of the orders that were expired by this call
+    """
+    if not order_refs:
+        return []
+
+    return _conditional_update(
+        [Order.order_id.in_(order_refs)],
+        [Order.payment_status == 'pending'],
+        {'payment_status': 'expired', 'updated_at': datetime.utcnow()}
+    )
+
+def claim_invitation(order_pk, lease_seconds):
+    """
+    Claim a paid order for one invitation run
+
+    The claim is a lease so a worker that dies mid-run does not block the
+    order forever. Concurrent or duplicate tasks lose the race and get None.
+    The lease expiry identifies the claim, so it is kept to whole seconds,
+    the precision of a MySQL DATETIME.
+
+    Returns:
+        Row: The updated status columns, or None if not claimable
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = _conditional_update(
+        [Order.id == order_pk],
+        [
+            Order.payment_status == 'paid',
+            Order.invitation_status.in_(CLAIMABLE_INVITATION_STATUSES),
+            or_(Order.invitation_locked_until.is_(None), Order.invitation_locked_until < now)
+        ],
+        {
+            'invitation_status': 'processing',
+            'invitation_locked_until': now + timedelta(seconds=lease_seconds),
+            'updated_at': now
+        }
+    )
+    return rows[0] if rows else None
+
+def finish_invitation(order_pk, invitation_status, claim=None):
+    """
+    Release the invitation claim and record the outcome
+
+    Args:
+        order_pk (int): Order primary key
+        invitation_status (str): 'sent', 'failed', 'manual_review_required',
+            or 'processing' to release the claim for a scheduled retry
+        claim (Row): What claim_invitation returned; if given, the order is only
+            updated while that claim still holds it
+
+    Returns:
+        Row: The updated status columns, or None if the order already reached 'sent'
+            or the claim was lost
+    """
+    guard_conditions = [Order.invitation_status != 'sent']
+    if claim is not None:
+        guard_conditions.append(Order.invitation_locked_until == claim.invitation_locked_until)
+    rows = _conditional_update(
+        [Order.id == order_pk],
+        guard_conditions,
+        {
+            'invitation_status': invitation_status,
+            'invitation_locked_until': None,
+            'updated_at': datetime.utcnow()
+        }
+    )
+    return rows[0] if rows else None
@@ -0,0 +1,157 @@
+import hashlib
+from datetime import datetime
+from flask import current_app
+
+from models import db, Order, ArchivedOrder
+from utils.db_routing import reading_from_replica, pin_to_primary
+from utils.cache import (
+    cache_get_json, cache_set_json, cache_delete, cache_get_many_json, cache_set_many_json
+)
+
+STATUS_CACHE_PREFIX = 'orders:status_payload:'
+NOT_FOUND_MARKER = {'not_found': True}
+
+def generate_status_message(order):
+    """Generate human-readable status message"""
+    if order.payment_status == 'pending':
+        return "Menunggu pembayaran. Silakan selesaikan pembayaran sesuai instruksi."
+    elif order.payment_status == 'failed':
+        return "Pembayaran gagal. Silakan coba lagi atau hubungi support."
+    elif order.payment_status == 'expired':
+        return "Pembayaran kedaluwarsa. Silakan buat pesanan baru."
+    elif order.payment_status == 'paid':
+        if order.invitation_status == 'pending':
+            return "Pembayaran berhasil. Proses undangan akan segera dimulai."
+        elif order.invitation_status == 'processing':
+            return "Pembayaran berhasil. Undangan sedang diproses dan akan dikirim dalam 5-30 menit."
+        elif order.invitation_status == 'sent':
+            return f"Undangan ChatGPT Plus telah dikirim ke {order.customer_email}. Silakan cek inbox dan spam folder."
+        elif order.invitation_status == 'failed':
+            return "Pembayaran berhasil, namun ada kendala dalam pengiriman undangan. Tim support akan menghubungi Anda."
+        elif order.invitation_status == 'manual_review_required':
+            return "Pembayaran berhasil. Undangan memerlukan review manual. Tim support akan menghubungi Anda segera."
+
+    return "Status tidak diketahui. Silakan hubungi support."
+
+def build_status_payload(order):
+    """Build the public status payload returned by the status endpoints"""
+    return {
+        'order_id': order.order_id,
+        'payment_status': order.payment_status,
+        'invitation_status': order.invitation_status,
+        'message': generate_status_message(order),
+        'updated_at': order.updated_at.isoformat() if order.updated_at else None
+    }
+
+def is_final_status(payload):
+    """True once the order will not change again without manual action"""
+    if payload['payment_status'] in ('failed', 'expired'):
+        return True
+    return payload['invitation_status'] in ('sent', 'failed', 'manual_review_required')
+
+def status_etag(payload):
+    """ETag for a status payload, changes only when one of the statuses is written"""
+    key = f"{payload['payment_status']}|{payload['invitation_status']}|{payload.get('updated_at')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+# (payment_status, invitation_status) -> [(seconds in state, poll interval), ...]
+# The last interval applies once the order has been in the state longer than every threshold.
+POLL_BACKOFF = {
+    ('pending', 'pending'): [(600, 5), (3600, 15), (None, 60)],
+    ('paid', 'pending'): [(None, 5)],
+    ('paid', 'processing'): [(300, 10), (1800, 30), (None, 60)],
+}
+
+def compute_poll_after(payload, now=None):
+    """
+    Suggest how long a client should wait before polling again
+
+    Returns:
+        int: Seconds to wait, or None when the status is final
+    """
+    if is_final_status(payload):
+        return None
+
+    schedule = POLL_BACKOFF.get((payload['payment_status'], payload['invitation_status']), [(None, 30)])
+    updated_at = payload.get('updated_at')
+    elapsed = ((now or datetime.utcnow()) - datetime.fromisoformat(updated_at)).total_seconds() if updated_at else 0
+
+    for threshold, interval in schedule:
+        if threshold is None or elapsed < threshold:
+            return interval
+    return schedule[-1][1]
+
+def get_cached_order_status(order_id):
+    """
+    Look up a cached status payload
+
+    Returns:
+        dict: The payload, NOT_FOUND_MARKER for a recently missed id, or None on a cache miss
+    """
+    return cache_get_json(STATUS_CACHE_PREFIX + order_id)
+
+def cache_order_status(order, if_newer=False):
+    """
+    Render the status payload for an order and store it in the cache
+
+    Pass if_newer when the order was read from the replica, so a lagging
+    read cannot replace a fresher payload written by publish_order_status.
+    """
+    payload = build_status_payload(order)
+    cache_set_many_json({STATUS_CACHE_PREFIX + order.order_id: payload},
+                        current_app.config.get('ORDER_STATUS_CACHE_TTL', 120), if_newer=if_newer)
+    return payload
+
+def cache_missing_order_status(order_id):
+    """Remember briefly that an order id does not exist so probes skip the database"""
+    cache_set_json(STATUS_CACHE_PREFIX + order_id, NOT_FOUND_MARKER,
+                   current_app.config.get('ORDER_STATUS_NEGATIVE_TTL', 30))
+
+def invalidate_order_status(*order_ids):
+    """Drop cached status payloads"""
+    cache_delete(*[STATUS_CACHE_PREFIX + order_id for order_id in order_ids])
+
+def get_order_statuses(order_ids):
+    """
+    Resolve the status payloads of many orders at once
+
+    Cached entries are read with one MGET, the rest with a single IN query
+    (plus one on the archive for ids still missing), and both positive and negative results are written back in one pipeline.
+
+    Returns:
+        dict: order_id -> payload, or NOT_FOUND_MARKER for unknown ids
+    """
+    cached = cache_get_many_json([STATUS_CACHE_PREFIX + order_id for order_id in order_ids])
+    results = {order_id: payload for order_id, payload in zip(order_ids, cached) if payload is not None}
+
+    missing = [order_id for order_id in order_ids if order_id not in results]
+    if not missing:
+        return results
+
+    from_replica = reading_from_replica(db.session)
+    found = {}
+    for order in Order.query.filter(Order.order_id.in_(missing)).all():
+        found[STATUS_CACHE_PREFIX + order.order_id] = results[order.order_id] = build_status_payload(order)
+    
+    # Slow path for orders moved out of the hot table
+    archived = [order_id for order_id in missing if order_id not in results]
+    if archived:
+        for order in ArchivedOrder.query.filter(ArchivedOrder.order_id.in_(archived)).all():
+            found[STATUS_CACHE_PREFIX + order.order_id] = results[order.order_id] = build_status_payload(order)
+
+    # A just-created order may not have reached the replica yet
+    lagging = [order_id for order_id in missing if order_id not in results]
+    if lagging and from_replica:
+        pin_to_primary(db.session)
+        for order in Order.query.filter(Order.order_id.in_(lagging)).all():
+            found[STATUS_CACHE_PREFIX + order.order_id] = results[order.order_id] = build_status_payload(order)
+
+    not_found = {}
+    for order_id in missing:
+        if order_id not in results:
+            not_found[STATUS_CACHE_PREFIX + order_id] = results[order_id] = NOT_FOUND_MARKER
+
+    cache_set_many_json(found, current_app.config.get('ORDER_STATUS_CACHE_TTL', 120),
+                        if_newer=from_replica)
+    cache_set_many_json(not_found, current_app.config.get('ORDER_STATUS_NEGATIVE_TTL', 30))
+    return results
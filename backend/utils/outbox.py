@@ -0,0 +1,18 @@
+from models import db, OutboxEvent
+
+# Event types written by the webhook and the invitation task, handled by tasks.relay_outbox
+INVITATION_REQUESTED = 'invitation.requested'
+PAYMENT_CONFIRMATION_EMAIL = 'email.payment_confirmation'
+INVITATION_CONFIRMATION_EMAIL = 'email.invitation_confirmation'
+MANUAL_REVIEW_NOTIFICATION = 'email.manual_review'
+
+def add_outbox_event(event_type, **payload):
+    """
+    Record a side effect in the current transaction
+
+    The event is only visible to the relay once the surrounding status
+    change commits, and is lost together with it on rollback.
+    """
+    event = OutboxEvent(event_type=event_type, payload=payload)
+    db.session.add(event)
+    return event
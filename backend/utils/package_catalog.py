@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from itertools import chain
+import redis
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Package
+from utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_INVALIDATION_CHANNEL = 'packages:invalidate'
+
+# Per-process catalog: {'packages': {...}, 'body': bytes, 'etag': str, 'loaded_at': epoch seconds}
+_catalog = None
+_catalog_lock = threading.Lock()
+_subscriber_pid = None
+
+def _serialize_price(price):
+    """Rupiah prices are whole numbers, keep them as ints in the JSON payload"""
+    return int(price) if price == int(price) else float(price)
+
+def _load_catalog():
+    """Read active packages from the database and pre-serialize the API payload"""
+    packages = {}
+    for package in Package.query.filter_by(is_active=True).order_by(Package.price).all():
+        packages[package.id] = {
+            'name': package.name,
+            'price': _serialize_price(package.price),
+            'duration': package.duration,
+            'description': package.description
+        }
+
+    body = json.dumps({'packages': packages}, separators=(',', ':')).encode('utf-8')
+    return {
+        'packages': packages,
+        'body': body,
+        'etag': hashlib.sha1(body).hexdigest(),
+        'loaded_at': time.time()
+    }
+
+def _listen_for_invalidations(app):
+    """Drop the local catalog whenever another process publishes a change"""
+    global _catalog
+    while True:
+        try:
+            with app.app_context():
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(PACKAGE_INVALIDATION_CHANNEL)
+            # Anything published while we were disconnected is unknown, start clean
+            _catalog = None
+            while True:
+                message = pubsub.get_message(timeout=30)
+                if message:
+                    _catalog = None
+                    logger.info("Package catalog invalidated")
+        except redis.RedisError as e:
+            logger.warning(f"Package invalidation listener disconnected: {str(e)}")
+            time.sleep(5)
+
+def _ensure_subscriber():
+    """Start the invalidation listener once per process (gunicorn/celery fork after import)"""
+    global _subscriber_pid
+    if _subscriber_pid == os.getpid():
+        return
+    _subscriber_pid = os.getpid()
+    app = current_app._get_current_object()
+    threading.Thread(
+        target=_listen_for_invalidations, args=(app,),
+        name='package-catalog-invalidation', daemon=True
+    ).start()
+
+def get_package_catalog():
+    """
+    Get the active package catalog
+
+    Returns:
+        dict: {'packages': {...}, 'body': bytes, 'etag': str, 'loaded_at': float}
+    """
+    global _catalog
+    _ensure_subscriber()
+
+    catalog = _catalog
+    max_age = current_app.config.get('PACKAGE_CATALOG_TTL', 300)
+    if catalog is not None and time.time() - catalog['loaded_at'] < max_age:
+        return catalog
+
+    with _catalog_lock:
+        catalog = _catalog
+        if catalog is None or time.time() - catalog['loaded_at'] >= max_age:
+            catalog = _catalog = _load_catalog()
+    return catalog
+
+def get_package(package_id):
+    """Get a single active package by id, or None"""
+    return get_package_catalog()['packages'].get(package_id)
+
+def invalidate_package_catalog():
+    """Drop the local catalog and tell every other process to do the same"""
+    global _catalog
+    _catalog = None
+    try:
+        get_redis().publish(PACKAGE_INVALIDATION_CHANNEL, str(time.time()))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish package invalidation: {str(e)}")
+
+@event.listens_for(Session, 'after_flush')
+def _track_package_changes(session, flush_context):
+    changed = chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, Package) for obj in changed):
+        session.info['packages_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _publish_package_changes(session):
+    if session.info.pop('packages_changed', False):
+        invalidate_package_catalog()
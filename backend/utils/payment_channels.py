@@ -0,0 +1,148 @@
+import time
+import logging
+import threading
+import redis
+from flask import current_app
+
+from utils.cache import get_redis, cache_get_json, cache_set_json
+from utils.tripay_client import get_tripay_client
+
+logger = logging.getLogger(__name__)
+
+CHANNELS_CACHE_KEY = 'tripay:payment_channels'
+CHANNELS_REFRESH_LOCK_KEY = 'tripay:payment_channels:refresh'
+CHANNELS_FAILURE_KEY = 'tripay:payment_channels:failed'
+
+# In-process copy of the catalog: {'channels': [...], 'fetched_at': epoch seconds}
+_local_entry = None
+_local_failure_until = 0  # Epoch seconds, see _remember_failure
+_refresh_in_progress = threading.Lock()
+
+def _is_fresh(entry, now):
+    return entry is not None and now - entry['fetched_at'] < current_app.config.get('PAYMENT_CHANNELS_TTL', 3600)
+
+def _is_usable(entry, now):
+    max_age = current_app.config.get('PAYMENT_CHANNELS_TTL', 3600) + \
+        current_app.config.get('PAYMENT_CHANNELS_STALE_TTL', 86400)
+    return entry is not None and now - entry['fetched_at'] < max_age
+
+def _remember_failure():
+    """Skip synchronous refreshes for PAYMENT_CHANNELS_FAILURE_TTL, in this process and the others"""
+    global _local_failure_until
+    ttl = current_app.config.get('PAYMENT_CHANNELS_FAILURE_TTL', 30)
+    _local_failure_until = time.time() + ttl
+    try:
+        get_redis().set(CHANNELS_FAILURE_KEY, '1', ex=ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache payment channel refresh failure: {str(e)}")
+
+def _recently_failed(now):
+    if now < _local_failure_until:
+        return True
+    try:
+        return bool(get_redis().exists(CHANNELS_FAILURE_KEY))
+    except redis.RedisError:
+        return False
+
+def refresh_payment_channels():
+    """
+    Fetch the channel list from Tripay and update both cache layers
+
+    Returns:
+        dict: The new cache entry, or None if Tripay could not be reached
+    """
+    global _local_entry
+    result = get_tripay_client().get_payment_channels(
+        timeout=current_app.config.get('PAYMENT_CHANNELS_FETCH_TIMEOUT', 5)
+    )
+    if not result.get('success'):
+        logger.error(f"Payment channel refresh failed: {result.get('error')}")
+        _remember_failure()
+        return None
+
+    entry = {'channels': result.get('data', []), 'fetched_at': time.time()}
+    ttl = current_app.config.get('PAYMENT_CHANNELS_TTL', 3600) + \
+        current_app.config.get('PAYMENT_CHANNELS_STALE_TTL', 86400)
+    cache_set_json(CHANNELS_CACHE_KEY, entry, int(ttl))
+    _local_entry = entry
+    logger.info(f"Payment channel catalog refreshed: {len(entry['channels'])} channels")
+    return entry
+
+def _refresh_in_background():
+    """Refresh the catalog on a daemon thread, at most once across all workers"""
+    if not _refresh_in_progress.acquire(blocking=False):
+        return
+
+    try:
+        lock_ttl = current_app.config.get('PAYMENT_CHANNELS_REFRESH_LOCK_TTL', 30)
+        if not get_redis().set(CHANNELS_REFRESH_LOCK_KEY, '1', nx=True, ex=lock_ttl):
+            _refresh_in_progress.release()
+            return
+    except redis.RedisError as e:
+        logger.warning(f"Payment channel refresh lock unavailable: {str(e)}")
+
+    app = current_app._get_current_object()
+
+    def run():
+        try:
+            with app.app_context():
+                refresh_payment_channels()
+        except Exception as e:
+            logger.error(f"Background payment channel refresh failed: {str(e)}")
+        finally:
+            _refresh_in_progress.release()
+
+    threading.Thread(target=run, name='payment-channel-refresh', daemon=True).start()
+
+def get_payment_channels():
+    """
+    Get the Tripay payment channel catalog
+
+    Served from the in-process copy, then Redis, then Tripay. Entries older
+    than PAYMENT_CHANNELS_TTL are still served (up to PAYMENT_CHANNELS_STALE_TTL)
+    while a background refresh runs. After a failed refresh, callers get None
+    for PAYMENT_CHANNELS_FAILURE_TTL instead of each waiting on Tripay.
+
+    Returns:
+        list: Channel dicts as returned by Tripay, or None if no catalog is available
+    """
+    global _local_entry
+    now = time.time()
+
+    entry = _local_entry
+    if not _is_fresh(entry, now):
+        shared = cache_get_json(CHANNELS_CACHE_KEY)
+        if shared and (entry is None or shared['fetched_at'] > entry['fetched_at']):
+            _local_entry = entry = shared
+
+    if _is_fresh(entry, now):
+        return entry['channels']
+
+    if _is_usable(entry, now):
+        _refresh_in_background()
+        return entry['channels']
+
+    # Nothing usable cached, the caller has to wait for Tripay, unless it just failed
+    if _recently_failed(now):
+        return None
+    entry = refresh_payment_channels()
+    return entry['channels'] if entry else None
+
+def get_active_payment_channels():
+    """Get only the channels currently enabled on the merchant account"""
+    channels = get_payment_channels()
+    if channels is None:
+        return None
+    return [channel for channel in channels if channel.get('active', True)]
+
+def is_supported_payment_method(method):
+    """
+    Check a payment method code against the cached catalog
+
+    Returns True when the catalog is unavailable so a Tripay outage on the
+    channel endpoint does not block order creation.
+    """
+    channels = get_active_payment_channels()
+    if channels is None:
+        return True
+    return any(channel.get('code') == method for channel in channels)
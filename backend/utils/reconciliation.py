@@ -0,0 +1,136 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Order
+from utils.tripay_client import get_tripay_client
+from utils.webhook_events import record_webhook_event, TRIPAY_STATUS_MAPPING
+
+logger = logging.getLogger(__name__)
+
+class _Throttle:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay:
+            time.sleep(delay)
+
+def find_unconfirmed_orders(now=None):
+    """
+    Orders with a Tripay reference that may have missed their callback
+
+    Pending orders old enough to have missed it but not yet due for
+    expiry come first, oldest first, so orders closest to the expiry
+    cutoff are checked first. Then orders expired within the last
+    RECONCILE_EXPIRED_WINDOW, which Tripay may have seen paid just before
+    the deadline.
+
+    Returns:
+        list: (order_id, reference, payment_status) rows
+    """
+    now = now or datetime.utcnow()
+    min_age = current_app.config.get('RECONCILE_MIN_AGE', 120)
+    max_age = current_app.config.get('RECONCILE_MAX_AGE', 24 * 3600)
+    expired_window = current_app.config.get('RECONCILE_EXPIRED_WINDOW', 3600)
+    limit = current_app.config.get('RECONCILE_BATCH_LIMIT', 200)
+    columns = (Order.order_id, Order.reference, Order.payment_status)
+
+    orders = db.session.execute(
+        select(*columns).where(
+            Order.payment_status == 'pending',
+            Order.created_at >= now - timedelta(seconds=max_age),
+            Order.created_at < now - timedelta(seconds=min_age),
+            Order.reference.isnot(None)
+        ).order_by(Order.created_at).limit(limit)
+    ).all()
+    if len(orders) >= limit or not expired_window:
+        return orders
+
+    # updated_at is when expiry wrote the row; an expired order has no invitation,
+    # so the invitation_status condition lets this use the status/updated_at index
+    return orders + db.session.execute(
+        select(*columns).where(
+            Order.invitation_status == 'pending',
+            Order.payment_status == 'expired',
+            Order.updated_at >= now - timedelta(seconds=expired_window),
+            Order.reference.isnot(None)
+        ).order_by(Order.updated_at).limit(limit - len(orders))
+    ).all()
+
+def reconcile_pending_payments(now=None):
+    """
+    Ask Tripay for the state of unconfirmed orders and journal any change
+
+    Lookups run on RECONCILE_CONCURRENCY threads over the client's pooled
+    session, throttled to RECONCILE_RATE_PER_SECOND. A 429 stops new
+    lookups for this run. Changes are recorded as webhook events, so they
+    go through the same journal, state machine and outbox as callbacks,
+    and a callback arriving later is dropped as a duplicate.
+
+    Returns:
+        dict: checked, recorded (new journal events) and rate_limited
+    """
+    orders = find_unconfirmed_orders(now)
+    # End the read transaction before the slow HTTP calls
+    db.session.commit()
+    if not orders:
+        return {'checked': 0, 'recorded': 0, 'rate_limited': False}
+
+    tripay_client = get_tripay_client()
+    throttle = _Throttle(current_app.config.get('RECONCILE_RATE_PER_SECOND', 5))
+    rate_limited = threading.Event()
+
+    def lookup(row):
+        if rate_limited.is_set():
+            return row, None
+        throttle.wait()
+        result = tripay_client.get_transaction_detail(row.reference)
+        if result.get('rate_limited'):
+            rate_limited.set()
+        return row, result
+
+    with ThreadPoolExecutor(max_workers=current_app.config.get('RECONCILE_CONCURRENCY', 4)) as pool:
+        results = list(pool.map(lookup, orders))
+
+    checked = 0
+    recorded = 0
+    for row, result in results:
+        if result is None:
+            continue
+        checked += 1
+        if not result['success']:
+            logger.warning(f"Reconciliation lookup failed for order {row.order_id}: {result.get('error')}")
+            continue
+
+        status = result.get('status')
+        if TRIPAY_STATUS_MAPPING.get(status, 'pending') in ('pending', row.payment_status):
+            continue
+
+        data = result['data']
+        event = record_webhook_event({
+            'reference': row.reference,
+            'merchant_ref': row.order_id,
+            'status': status,
+            'total_amount': data.get('total_amount', data.get('amount')),
+            'source': 'reconciliation'
+        })
+        if event:
+            recorded += 1
+            logger.info(f"Reconciliation found order {row.order_id} {status} without a callback")
+
+    if rate_limited.is_set():
+        logger.warning(f"Reconciliation rate limited by Tripay after {checked} lookups")
+    return {'checked': checked, 'recorded': recorded, 'rate_limited': rate_limited.is_set()}
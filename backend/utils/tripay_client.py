@@ -4,6 +4,7 @@ import hashlib
 import json
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from flask import current_app
 
@@ -18,6 +19,12 @@ class TripayClient:
         self.base_url = current_app.config.get('TRIPAY_BASE_URL', 'https://tripay.co.id/api')
         self.callback_url = current_app.config.get('TRIPAY_CALLBACK_URL')
         
+        # Keep-alive connections shared by every call, sized for the reconciler's workers
+        pool_size = current_app.config.get('TRIPAY_POOL_SIZE', 8)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        
         if not all([self.api_key, self.merchant_code, self.private_key]):
             logger.error("Tripay credentials not properly configured")
             raise ValueError("Missing Tripay credentials in configuration")
@@ -103,7 +110,7 @@ class TripayClient:
             logger.info(f"Creating Tripay transaction: {payload['merchant_ref']}")
             logger.info(f"Tripay URL: {url}")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self.session.post(url, headers=headers, json=payload, timeout=30)
             
             logger.info(f"Tripay response status: {response.status_code}")
             logger.info(f"Tripay response body: {response.text}")
@@ -216,10 +223,69 @@ class TripayClient:
             logger.error(f"Signature verification error: {str(e)}")
             return False
     
-    def get_payment_channels(self):
+    def get_transaction_detail(self, reference):
+        """
+        Get the current state of a transaction from Tripay
+        
+        Args:
+            reference (str): Tripay transaction reference
+        
+        Returns:
+            dict: success, status (Tripay status, e.g. PAID/UNPAID/EXPIRED) and
+            data on success; error and rate_limited on failure
+        """
+        try:
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            }
+            
+            url = f"{self.base_url}/transaction/detail"
+            response = self.session.get(url, headers=headers, params={'reference': reference}, timeout=15)
+            
+            if response.status_code == 429:
+                return {
+                    'success': False,
+                    'rate_limited': True,
+                    'error': 'Rate limited by Tripay'
+                }
+            if response.status_code != 200:
+                return {
+                    'success': False,
+                    'rate_limited': False,
+                    'error': f'HTTP {response.status_code}: {response.text}'
+                }
+            
+            result = response.json()
+            if not result.get('success', False):
+                return {
+                    'success': False,
+                    'rate_limited': False,
+                    'error': result.get('message', 'Unknown error')
+                }
+            
+            data = result.get('data', {})
+            return {
+                'success': True,
+                'status': data.get('status'),
+                'data': data
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get transaction detail for {reference}: {str(e)}")
+            return {
+                'success': False,
+                'rate_limited': False,
+                'error': str(e)
+            }
+    
+    def get_payment_channels(self, timeout=30):
         """
         Get available payment channels from Tripay
         
+        Args:
+            timeout (float): Request timeout in seconds
+        
         Returns:
             dict: Available payment channels
         """
@@ -230,7 +296,7 @@ class TripayClient:
             }
             
             url = f"{self.base_url}/merchant/payment-channel"
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 result = response.json()
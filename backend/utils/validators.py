@@ -1,7 +1,8 @@
 import re
 import phonenumbers
 from email_validator import validate_email, EmailNotValidError
-from flask import current_app
+
+from utils.package_catalog import get_package
 
 def validate_email_format(email):
     """Validate email format using email-validator library"""
@@ -33,9 +34,8 @@ def validate_phone_number(phone):
         return False, f"Phone number parse error: {str(e)}"
 
 def validate_package_id(package_id):
-    """Validate if package_id exists in configuration"""
-    packages = current_app.config.get('PACKAGES', {})
-    if package_id not in packages:
+    """Validate if package_id is an active package in the catalog"""
+    if get_package(package_id) is None:
         return False, f"Invalid package_id: {package_id}"
     return True, package_id
 
@@ -0,0 +1,85 @@
+import logging
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, WebhookEvent
+from utils.order_state import apply_payment_status
+from utils.outbox import add_outbox_event, INVITATION_REQUESTED, PAYMENT_CONFIRMATION_EMAIL
+
+logger = logging.getLogger(__name__)
+
+# Map Tripay status to our internal status
+TRIPAY_STATUS_MAPPING = {
+    'PAID': 'paid',
+    'EXPIRED': 'expired',
+    'FAILED': 'failed',
+    'UNPAID': 'pending'
+}
+
+def record_webhook_event(webhook_data):
+    """
+    Journal a verified Tripay callback
+
+    The (reference, status) unique key rejects redeliveries before any
+    order is looked up.
+
+    Returns:
+        WebhookEvent: The stored event, or None if it was already received
+    """
+    event = WebhookEvent(
+        reference=webhook_data['reference'],
+        status=webhook_data['status'],
+        merchant_ref=webhook_data['merchant_ref'],
+        payload={k: v for k, v in webhook_data.items() if k != 'signature'}
+    )
+    db.session.add(event)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return event
+
+def apply_webhook_event(event):
+    """
+    Apply a journaled callback to its order
+
+    Runs inside the caller's transaction. Applying an event twice is a
+    no-op because the payment transition is conditional.
+
+    Returns:
+        Row: Updated order status columns, or None if nothing changed
+    """
+    new_status = TRIPAY_STATUS_MAPPING.get(event.status, 'pending')
+
+    order = apply_payment_status(event.merchant_ref, new_status)
+    if order is None:
+        logger.info(f"Tripay callback {event.reference} for order {event.merchant_ref} ignored: -> {new_status} not applicable")
+        return None
+
+    # If payment is successful, record the invitation and email in the same transaction
+    if new_status == 'paid':
+        add_outbox_event(INVITATION_REQUESTED, order_id=order.id)
+        add_outbox_event(PAYMENT_CONFIRMATION_EMAIL, order_id=order.id)
+
+    logger.info(f"Tripay callback processed successfully for order {event.merchant_ref}: -> {new_status}")
+    return order
+
+def reset_webhook_events(since, until, status=None):
+    """
+    Mark journaled events in a time range as unprocessed so they are replayed
+
+    Returns:
+        int: Number of events queued for replay
+    """
+    stmt = update(WebhookEvent).where(
+        WebhookEvent.received_at >= since,
+        WebhookEvent.received_at < until
+    ).values(processed_at=None, attempts=0, last_error=None, available_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    if status:
+        stmt = stmt.where(WebhookEvent.status == status)
+
+    count = db.session.execute(stmt).rowcount
+    db.session.commit()
+    return count
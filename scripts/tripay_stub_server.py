@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Local Tripay stand-in for testing payments without the sandbox
+
+Implements the endpoints the backend uses (transaction/create,
+transaction/detail, merchant/payment-channel) plus control endpoints to
+change a transaction's status, optionally without sending the callback,
+to exercise the reconciliation poller.
+
+Usage:
+    python scripts/tripay_stub_server.py
+    # backend: TRIPAY_BASE_URL=http://localhost:5055
+    curl -X POST localhost:5055/_stub/transactions/<reference> \\
+         -H 'Content-Type: application/json' -d '{"status": "PAID", "callback": false}'
+
+Environment:
+    STUB_PORT            Port to listen on (default 5055)
+    TRIPAY_PRIVATE_KEY   Key used to sign callbacks (must match the backend)
+    STUB_CALLBACK_URL    Where callbacks go (default: callback_url of the transaction)
+    STUB_RATE_LIMIT      Requests per second before answering 429 (default 20, 0 disables)
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import hashlib
+import threading
+import requests
+from flask import Flask, request, jsonify
+
+app = Flask(__name__)
+
+PRIVATE_KEY = os.getenv('TRIPAY_PRIVATE_KEY', 'stub-private-key')
+CALLBACK_URL = os.getenv('STUB_CALLBACK_URL')
+RATE_LIMIT = float(os.getenv('STUB_RATE_LIMIT', '20'))
+
+CHANNELS = [
+    {'group': 'E-Wallet', 'code': 'QRIS', 'name': 'QRIS', 'type': 'direct', 'active': True,
+     'fee_merchant': {'flat': 750, 'percent': 0.7}, 'fee_customer': {'flat': 0, 'percent': 0},
+     'minimum_amount': 1000, 'maximum_amount': 5000000},
+    {'group': 'Virtual Account', 'code': 'BRIVA', 'name': 'BRI Virtual Account', 'type': 'direct', 'active': True,
+     'fee_merchant': {'flat': 4250, 'percent': 0}, 'fee_customer': {'flat': 0, 'percent': 0},
+     'minimum_amount': 10000, 'maximum_amount': 5000000},
+]
+
+transactions = {}
+lock = threading.Lock()
+window = {'second': 0, 'count': 0}
+
+@app.before_request
+def check_request():
+    if request.path.startswith('/_stub'):
+        return None
+    if not request.headers.get('Authorization', '').startswith('Bearer '):
+        return jsonify({'success': False, 'message': 'Invalid API key'}), 401
+    if RATE_LIMIT:
+        with lock:
+            second = int(time.time())
+            if window['second'] != second:
+                window['second'], window['count'] = second, 0
+            window['count'] += 1
+            if window['count'] > RATE_LIMIT:
+                return jsonify({'success': False, 'message': 'Too many requests'}), 429
+    return None
+
+@app.route('/transaction/create', methods=['POST'])
+def create_transaction():
+    payload = request.get_json()
+    reference = f"DEV-T{uuid.uuid4().hex[:10].upper()}"
+    transaction = {
+        'reference': reference,
+        'merchant_ref': payload['merchant_ref'],
+        'payment_method': payload['method'],
+        'amount': payload['amount'],
+        'total_amount': payload['amount'],
+        'customer_email': payload.get('customer_email'),
+        'callback_url': payload.get('callback_url'),
+        'checkout_url': f"http://localhost/checkout/{reference}",
+        'qr_string': f"00020101021226STUB{reference}" if payload['method'] == 'QRIS' else None,
+        'pay_code': None if payload['method'] == 'QRIS' else reference[-10:],
+        'expired_time': payload.get('expired_time', int(time.time()) + 24 * 3600),
+        'status': 'UNPAID'
+    }
+    with lock:
+        transactions[reference] = transaction
+    return jsonify({'success': True, 'message': '', 'data': transaction})
+
+@app.route('/transaction/detail', methods=['GET'])
+def transaction_detail():
+    transaction = transactions.get(request.args.get('reference', ''))
+    if not transaction:
+        return jsonify({'success': False, 'message': 'Transaction not found'}), 404
+    return jsonify({'success': True, 'message': '', 'data': transaction})
+
+@app.route('/merchant/payment-channel', methods=['GET'])
+def payment_channels():
+    return jsonify({'success': True, 'message': 'Success', 'data': CHANNELS})
+
+@app.route('/_stub/transactions', methods=['GET'])
+def list_transactions():
+    return jsonify(list(transactions.values()))
+
+@app.route('/_stub/transactions/<reference>', methods=['POST'])
+def set_status(reference):
+    """Set a transaction's status; sends the signed callback unless callback is false"""
+    transaction = transactions.get(reference)
+    if not transaction:
+        return jsonify({'error': 'Transaction not found'}), 404
+
+    body = request.get_json() or {}
+    transaction['status'] = body.get('status', 'PAID')
+    if transaction['status'] == 'PAID':
+        transaction['paid_at'] = int(time.time())
+
+    delivered = None
+    if body.get('callback', True):
+        delivered = send_callback(transaction)
+    return jsonify({'transaction': transaction, 'callback_status': delivered})
+
+def send_callback(transaction):
+    callback = {
+        'reference': transaction['reference'],
+        'merchant_ref': transaction['merchant_ref'],
+        'payment_method': transaction['payment_method'],
+        'payment_method_code': transaction['payment_method'],
+        'total_amount': transaction['total_amount'],
+        'is_closed_payment': 1,
+        'status': transaction['status'],
+        'paid_at': transaction.get('paid_at')
+    }
+    raw = json.dumps(callback).encode('utf-8')
+    signature = hmac.new(PRIVATE_KEY.encode('utf-8'), raw, hashlib.sha256).hexdigest()
+    try:
+        response = requests.post(
+            CALLBACK_URL or transaction['callback_url'],
+            data=raw,
+            headers={
+                'Content-Type': 'application/json',
+                'X-Callback-Event': 'payment_status',
+                'X-Callback-Signature': signature
+            },
+            timeout=10
+        )
+        return response.status_code
+    except requests.exceptions.RequestException as e:
+        print(f"Callback failed: {e}")
+        return None
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.getenv('STUB_PORT', '5055')), threaded=True)
@@ -1,12 +1,26 @@
 "use client"
 
 import type React from "react"
-import { useState } from "react"
+import { useRef, useState } from "react"
 import { useRouter } from "next/navigation"
 import { useOrder } from "../contexts/OrderContext"
 import { apiService } from "../services/apiService"
 import { Mail, User, Phone, Loader2, AlertCircle } from "lucide-react"
 
+// crypto.randomUUID only exists in secure contexts (HTTPS) and newer browsers
+const newIdempotencyKey = (): string => {
+  if (typeof crypto !== "undefined" && typeof crypto.randomUUID === "function") {
+    return crypto.randomUUID()
+  }
+  const bytes = new Uint8Array(16)
+  if (typeof crypto !== "undefined" && typeof crypto.getRandomValues === "function") {
+    crypto.getRandomValues(bytes)
+  } else {
+    for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256)
+  }
+  return Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join("")
+}
+
 const OrderForm: React.FC = () => {
   const router = useRouter()
   const { state, dispatch } = useOrder()
@@ -17,6 +31,8 @@ const OrderForm: React.FC = () => {
   })
   const [errors, setErrors] = useState<Record<string, string>>({})
   const [isSubmitting, setIsSubmitting] = useState(false)
+  // Created on the first submit and dropped whenever the form changes, so double clicks and retries reuse it
+  const idempotencyKey = useRef<string | null>(null)
 
   const validateEmail = (email: string): boolean => {
     const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/
@@ -31,6 +47,7 @@ const OrderForm: React.FC = () => {
 
   const handleInputChange = (field: string, value: string) => {
     setFormData((prev) => ({ ...prev, [field]: value }))
+    idempotencyKey.current = null
 
     // Real-time validation
     const newErrors = { ...errors }
@@ -87,7 +104,10 @@ const OrderForm: React.FC = () => {
         package_id: state.selectedPackage.id,
       }
 
-      const response = await apiService.createOrder(orderData)
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = newIdempotencyKey()
+      }
+      const response = await apiService.createOrder(orderData, idempotencyKey.current)
 
       dispatch({ type: "SET_CURRENT_ORDER", payload: response })
       dispatch({ type: "UPDATE_ORDER_DATA", payload: orderData })
@@ -13,6 +13,7 @@ interface OrderStatus {
   payment_status: "pending" | "paid" | "failed" | "expired"
   invitation_status: "pending" | "processing" | "sent" | "failed" | "manual_review_required"
   message: string
+  poll_after?: number | null
 }
 
 const ConfirmationPage: React.FC = () => {
@@ -21,7 +22,6 @@ const ConfirmationPage: React.FC = () => {
   const { state, dispatch } = useOrder()
   const [orderStatus, setOrderStatus] = useState<OrderStatus | null>(null)
   const [isLoading, setIsLoading] = useState(true)
-  const [pollingInterval, setPollingInterval] = useState<NodeJS.Timeout | null>(null)
   const [refreshTrigger, setRefreshTrigger] = useState(0)
 
   const orderId = searchParams.get("order_id") || state.currentOrder?.order_id
@@ -38,35 +38,56 @@ const ConfirmationPage: React.FC = () => {
       return
     }
 
+    const isFinal = (status: OrderStatus) =>
+      status.payment_status === "failed" ||
+      status.payment_status === "expired" ||
+      status.invitation_status === "sent" ||
+      status.invitation_status === "failed" ||
+      status.invitation_status === "manual_review_required"
+
+    let timeout: NodeJS.Timeout | null = null
+    let unsubscribe: (() => void) | null = null
+
+    // Fallback when the event stream is unavailable; the server's poll_after hint sets the pace
+    const startPolling = (delaySeconds = 5) => {
+      timeout = setTimeout(async () => {
+        let nextDelay = delaySeconds
+        try {
+          const updatedStatus = await apiService.getOrderStatus(orderId)
+          setOrderStatus(updatedStatus)
+
+          // Stop polling if payment failed/expired or invitation completed
+          if (isFinal(updatedStatus)) {
+            timeout = null
+            return
+          }
+          nextDelay = updatedStatus.poll_after ?? delaySeconds
+        } catch (error) {
+          console.error("Error polling order status:", error)
+        }
+        startPolling(nextDelay)
+      }, delaySeconds * 1000)
+    }
+
     const fetchOrderStatus = async () => {
       try {
         const status = await apiService.getOrderStatus(orderId)
         setOrderStatus(status)
         setIsLoading(false)
 
-        // Start polling if payment is pending or invitation is processing
+        // Listen for updates if payment is pending or invitation is processing
         if (status.payment_status === "pending" || status.invitation_status === "processing") {
-          const interval = setInterval(async () => {
-            try {
-              const updatedStatus = await apiService.getOrderStatus(orderId)
+          unsubscribe = apiService.subscribeOrderStatus(
+            orderId,
+            (updatedStatus) => {
               setOrderStatus(updatedStatus)
-
-              // Stop polling if payment failed/expired or invitation completed
-              if (
-                updatedStatus.payment_status === "failed" ||
-                updatedStatus.payment_status === "expired" ||
-                updatedStatus.invitation_status === "sent" ||
-                updatedStatus.invitation_status === "failed"
-              ) {
-                clearInterval(interval)
-                setPollingInterval(null)
+              if (isFinal(updatedStatus) && unsubscribe) {
+                unsubscribe()
+                unsubscribe = null
               }
-            } catch (error) {
-              console.error("Error polling order status:", error)
-            }
-          }, 5000) // Poll every 5 seconds
-
-          setPollingInterval(interval)
+            },
+            () => startPolling(status.poll_after ?? 5),
+          )
         }
       } catch (error) {
         dispatch({
@@ -80,8 +101,11 @@ const ConfirmationPage: React.FC = () => {
     fetchOrderStatus()
 
     return () => {
-      if (pollingInterval) {
-        clearInterval(pollingInterval)
+      if (unsubscribe) {
+        unsubscribe()
+      }
+      if (timeout) {
+        clearTimeout(timeout)
       }
     }
   }, [orderId, router, dispatch, refreshTrigger])
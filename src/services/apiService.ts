@@ -12,6 +12,7 @@ export interface CreateOrderResponse {
   order_id: string
   checkout_url: string
   reference: string
+  qr_string?: string
   status: string
 }
 
@@ -20,6 +21,7 @@ export interface OrderStatusResponse {
   payment_status: "pending" | "paid" | "failed" | "expired"
   invitation_status: "pending" | "processing" | "sent" | "failed" | "manual_review_required"
   message: string
+  poll_after?: number | null
 }
 
 // Import mock service
@@ -30,13 +32,13 @@ class ApiService {
     const url = `${API_BASE_URL}${endpoint}`
 
     const config: RequestInit = {
+      credentials: "include", // Added credentials for CORS if needed
+      ...options,
       headers: {
         "Content-Type": "application/json",
         Accept: "application/json", // Added Accept header for better API compatibility
         ...options.headers,
       },
-      credentials: "include", // Added credentials for CORS if needed
-      ...options,
     }
 
     try {
@@ -56,7 +58,7 @@ class ApiService {
     }
   }
 
-  async createOrder(orderData: CreateOrderRequest): Promise<CreateOrderResponse> {
+  async createOrder(orderData: CreateOrderRequest, idempotencyKey?: string): Promise<CreateOrderResponse> {
     if (USE_MOCK_API) {
       return mockApiService.createOrder(orderData)
     }
@@ -71,6 +73,8 @@ class ApiService {
 
     return this.request<CreateOrderResponse>("/api/orders", {
       method: "POST",
+      // Retries with the same key replay the original order instead of creating a new one
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
       body: JSON.stringify(payload),
     })
   }
@@ -83,6 +87,40 @@ class ApiService {
     return this.request<OrderStatusResponse>(`/api/orders/${orderId}/status`)
   }
 
+  /**
+   * Listen for order status changes over Server-Sent Events.
+   * Returns an unsubscribe function. onError is called when the stream is
+   * unavailable so the caller can fall back to polling.
+   */
+  subscribeOrderStatus(
+    orderId: string,
+    onStatus: (status: OrderStatusResponse) => void,
+    onError: () => void,
+  ): () => void {
+    if (USE_MOCK_API || typeof EventSource === "undefined") {
+      onError()
+      return () => {}
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/api/orders/${orderId}/events`, { withCredentials: true })
+    let received = false
+
+    source.addEventListener("status", (event) => {
+      received = true
+      onStatus(JSON.parse((event as MessageEvent).data))
+    })
+    source.onerror = () => {
+      // EventSource reconnects on its own once a stream has worked; give up if it never did,
+      // or if a reconnect was refused (e.g. 503 when the server has too many open streams)
+      if (!received || source.readyState === EventSource.CLOSED) {
+        source.close()
+        onError()
+      }
+    }
+
+    return () => source.close()
+  }
+
   async getPackages(): Promise<any> {
     if (USE_MOCK_API) {
       return { packages: {} }
@@ -90,6 +128,14 @@ class ApiService {
 
     return this.request<any>("/api/packages")
   }
+
+  async getPaymentChannels(): Promise<any> {
+    if (USE_MOCK_API) {
+      return { channels: [] }
+    }
+
+    return this.request<any>("/api/payment-channels")
+  }
 }
 
 export const apiService = new ApiService()